@@ -30,11 +30,8 @@ class ExpenseTrackerApp(tk.Tk):
         self.geometry("1200x700")
         self.minsize(800, 600)
         
-        # Set application icon
-        try:
-            self.iconbitmap("assets/icon.ico")
-        except:
-            pass  # Icon not found, use default
+        # Load cosmetic assets once the event loop is running
+        self.after_idle(self._load_assets)
         
         # Set data directory
         self.data_dir = "data"
@@ -43,6 +40,16 @@ class ExpenseTrackerApp(tk.Tk):
         # Initialize user state
         self.current_user = None
         self.current_theme = "light"
+        self.current_frame_name = None
+        
+        # Bumped whenever stored data changes so frames know to re-render
+        self.data_version = 0
+        
+        # Categories of the logged-in user, shared by all frames, with their lookup indexes
+        self.categories = []
+        self.categories_by_id = {}
+        self.top_level_categories = []
+        self.subcategories_by_parent = {}
         
         # Apply default theme
         self.theme = ThemeManager.apply_theme(self, self.current_theme)
@@ -53,18 +60,48 @@ class ExpenseTrackerApp(tk.Tk):
         container.grid_rowconfigure(0, weight=1)
         container.grid_columnconfigure(0, weight=1)
         
-        # Initialize frames dictionary
+        # Frames are created the first time they are shown
+        self.container = container
+        self.frame_classes = {F.__name__: F for F in (LoginFrame, RegisterFrame, DashboardFrame, ExpensesFrame,
+                                                      ProfileFrame, CategoriesFrame, ReportsFrame, BudgetsFrame)}
         self.frames = {}
-        
-        # Create and store all frames
-        for F in (LoginFrame, RegisterFrame, DashboardFrame, ExpensesFrame, ProfileFrame, CategoriesFrame, ReportsFrame, BudgetsFrame):
-            frame = F(container, self)
-            self.frames[F.__name__] = frame
-            frame.grid(row=0, column=0, sticky="nsew")
+        self.frames_with_on_show = set()
         
         # Show login frame by default
         self.show_frame("LoginFrame")
     
+    def _load_assets(self):
+        """Load application assets that are not needed for the first paint."""
+        # Set application icon
+        try:
+            self.iconbitmap("assets/icon.ico")
+        except:
+            pass  # Icon not found, use default
+    
+    def _build_frame(self, frame_name):
+        """
+        Create, place and cache the specified frame.
+        
+        Args:
+            frame_name (str): Name of the frame to create.
+            
+        Returns:
+            The created frame, or None if the name is unknown.
+        """
+        frame_class = self.frame_classes.get(frame_name)
+        if frame_class is None:
+            return None
+        
+        frame = frame_class(self.container, self)
+        self.frames[frame_name] = frame
+        frame.grid(row=0, column=0, sticky="nsew")
+        
+        # Remember once whether the frame wants to be notified when shown
+        if hasattr(frame, "on_show_frame"):
+            self.frames_with_on_show.add(frame_name)
+        
+        return frame
+    
     def show_frame(self, frame_name):
         """
         Show the specified frame.
@@ -72,14 +109,47 @@ class ExpenseTrackerApp(tk.Tk):
         Args:
             frame_name (str): Name of the frame to show.
         """
-        frame = self.frames.get(frame_name)
+        frame = self.frames.get(frame_name) or self._build_frame(frame_name)
         if frame:
             frame.tkraise()
+            self.current_frame_name = frame_name
             
             # Call on_show_frame if it exists
-            if hasattr(frame, "on_show_frame"):
+            if frame_name in self.frames_with_on_show:
                 frame.on_show_frame()
     
+    def mark_data_changed(self, categories=None):
+        """
+        Record that stored data changed so frames refresh on their next show.
+        
+        Args:
+            categories (list, optional): Categories of the logged-in user already loaded by the caller.
+                They are reloaded from disk when omitted.
+        """
+        self.data_version += 1
+        self.refresh_categories(categories)
+    
+    def refresh_categories(self, categories=None):
+        """
+        Reload the categories of the logged-in user into the shared category cache.
+        
+        Args:
+            categories (list, optional): Categories already loaded by the caller, used instead of reading them.
+        """
+        if self.current_user:
+            if categories is None:
+                categories = Category.get_all_categories(self.current_user.user_id, self.data_dir)
+            # Older stores may hold the default income categories without the income flag
+            Category.flag_income_categories(categories, self.data_dir)
+            self.categories = categories
+            self.categories_by_id = {cat.category_id: cat for cat in self.categories}
+            self.top_level_categories, self.subcategories_by_parent = Category.group_by_parent(self.categories)
+        else:
+            self.categories = []
+            self.categories_by_id = {}
+            self.top_level_categories = []
+            self.subcategories_by_parent = {}
+    
     def apply_theme(self, theme_name):
         """
         Apply the specified theme to the application.
@@ -87,31 +157,21 @@ class ExpenseTrackerApp(tk.Tk):
         Args:
             theme_name (str): Name of the theme to apply.
         """
+        if theme_name == self.current_theme:
+            return
+        
         self.theme = ThemeManager.apply_theme(self, theme_name)
         self.current_theme = theme_name
     
     def reload_frames(self):
-        """Reload all frames (recreate them)."""
+        """Reload all frames (recreate them on their next visit)."""
         # Get the current visible frame
-        current_visible = None
-        for name, frame in self.frames.items():
-            if frame.winfo_viewable():
-                current_visible = name
-                break
-        
-        # Get the container
-        container = next(iter(self.frames.values())).master
+        current_visible = self.current_frame_name
         
         # Destroy all frames
         for frame in self.frames.values():
             frame.destroy()
-        
-        # Recreate frames
         self.frames = {}
-        for F in (LoginFrame, RegisterFrame, DashboardFrame, ExpensesFrame, ProfileFrame, CategoriesFrame, ReportsFrame, BudgetsFrame):
-            frame = F(container, self)
-            self.frames[F.__name__] = frame
-            frame.grid(row=0, column=0, sticky="nsew")
         
         # Show the previously visible frame
         if current_visible:
@@ -120,15 +180,15 @@ class ExpenseTrackerApp(tk.Tk):
 
 def main():
     """Main entry point for the application."""
-    app = ExpenseTrackerApp()
-    
-    # Set DPI awareness for Windows
+    # Set DPI awareness for Windows before Tk reads the screen metrics
     try:
         from ctypes import windll
         windll.shcore.SetProcessDpiAwareness(1)
     except:
         pass
     
+    app = ExpenseTrackerApp()
+    
     try:
         app.mainloop()
     except Exception as e:
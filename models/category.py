@@ -2,15 +2,356 @@
 Category model for the expense tracking system.
 This module defines the Category class for managing expense categories.
 """
+import functools
 import json
 import os
-import uuid
 from datetime import datetime
+from .ids import new_id
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to the standard json module
+    orjson = None
+
+
+# Main categories created by Category.create_default_categories
+_DEFAULT_CATEGORIES = (
+    {"name": "Housing", "color": "#e74c3c", "budget": 0, "icon": "home"},
+    {"name": "Transportation", "color": "#3498db", "budget": 0, "icon": "car"},
+    {"name": "Food", "color": "#2ecc71", "budget": 0, "icon": "utensils"},
+    {"name": "Utilities", "color": "#f39c12", "budget": 0, "icon": "bolt"},
+    {"name": "Healthcare", "color": "#9b59b6", "budget": 0, "icon": "medkit"},
+    {"name": "Personal", "color": "#1abc9c", "budget": 0, "icon": "user"},
+    {"name": "Entertainment", "color": "#e67e22", "budget": 0, "icon": "film"},
+    {"name": "Education", "color": "#34495e", "budget": 0, "icon": "graduation-cap"},
+    {"name": "Savings", "color": "#27ae60", "budget": 0, "icon": "piggy-bank"},
+    {"name": "Income", "color": "#16a085", "budget": 0, "icon": "money-bill", "is_income": True},
+)
+
+# Sub-categories - created after main categories, linked by parent name
+_DEFAULT_SUBCATEGORIES = (
+    # Housing subcategories
+    {"name": "Rent/Mortgage", "parent": "Housing", "icon": "building"},
+    {"name": "Home Insurance", "parent": "Housing", "icon": "shield-alt"},
+    {"name": "Property Tax", "parent": "Housing", "icon": "file-invoice-dollar"},
+    {"name": "Repairs", "parent": "Housing", "icon": "tools"},
+    {"name": "Furniture", "parent": "Housing", "icon": "couch"},
+    
+    # Transportation subcategories
+    {"name": "Car Payment", "parent": "Transportation", "icon": "car-side"},
+    {"name": "Fuel", "parent": "Transportation", "icon": "gas-pump"},
+    {"name": "Insurance", "parent": "Transportation", "icon": "shield-alt"},
+    {"name": "Maintenance", "parent": "Transportation", "icon": "wrench"},
+    {"name": "Public Transit", "parent": "Transportation", "icon": "bus"},
+    
+    # Food subcategories
+    {"name": "Groceries", "parent": "Food", "icon": "shopping-cart"},
+    {"name": "Restaurants", "parent": "Food", "icon": "utensils"},
+    {"name": "Fast Food", "parent": "Food", "icon": "hamburger"},
+    {"name": "Coffee Shops", "parent": "Food", "icon": "coffee"},
+    
+    # Utilities subcategories
+    {"name": "Electricity", "parent": "Utilities", "icon": "bolt"},
+    {"name": "Water", "parent": "Utilities", "icon": "tint"},
+    {"name": "Gas", "parent": "Utilities", "icon": "fire"},
+    {"name": "Internet", "parent": "Utilities", "icon": "wifi"},
+    {"name": "Phone", "parent": "Utilities", "icon": "phone"},
+    
+    # Healthcare subcategories
+    {"name": "Insurance", "parent": "Healthcare", "icon": "shield-alt"},
+    {"name": "Medications", "parent": "Healthcare", "icon": "pills"},
+    {"name": "Doctor", "parent": "Healthcare", "icon": "user-md"},
+    {"name": "Dental", "parent": "Healthcare", "icon": "tooth"},
+    
+    # Personal subcategories
+    {"name": "Clothing", "parent": "Personal", "icon": "tshirt"},
+    {"name": "Gym", "parent": "Personal", "icon": "dumbbell"},
+    {"name": "Haircut", "parent": "Personal", "icon": "cut"},
+    {"name": "Cosmetics", "parent": "Personal", "icon": "spa"},
+    
+    # Entertainment subcategories
+    {"name": "Movies", "parent": "Entertainment", "icon": "film"},
+    {"name": "Music", "parent": "Entertainment", "icon": "music"},
+    {"name": "Games", "parent": "Entertainment", "icon": "gamepad"},
+    {"name": "Streaming Services", "parent": "Entertainment", "icon": "tv"},
+    {"name": "Hobbies", "parent": "Entertainment", "icon": "palette"},
+    
+    # Education subcategories
+    {"name": "Tuition", "parent": "Education", "icon": "university"},
+    {"name": "Books", "parent": "Education", "icon": "book"},
+    {"name": "Courses", "parent": "Education", "icon": "laptop-code"},
+    
+    # Savings subcategories
+    {"name": "Emergency Fund", "parent": "Savings", "icon": "umbrella"},
+    {"name": "Retirement", "parent": "Savings", "icon": "hand-holding-usd"},
+    {"name": "Investments", "parent": "Savings", "icon": "chart-line"},
+    
+    # Income subcategories
+    {"name": "Salary", "parent": "Income", "icon": "briefcase", "is_income": True},
+    {"name": "Bonus", "parent": "Income", "icon": "gift", "is_income": True},
+    {"name": "Interest", "parent": "Income", "icon": "percentage", "is_income": True},
+    {"name": "Dividends", "parent": "Income", "icon": "chart-pie", "is_income": True},
+    {"name": "Freelance", "parent": "Income", "icon": "laptop-code", "is_income": True},
+    {"name": "Rental", "parent": "Income", "icon": "home", "is_income": True},
+)
+
+
+# Directories already created by this process
+_ensured_dirs = set()
+
+
+def _ensure_dir(path):
+    """Create a directory once per process instead of on every write."""
+    if path not in _ensured_dirs:
+        os.makedirs(path, exist_ok=True)
+        _ensured_dirs.add(path)
+
+
+def _load_json(path):
+    """Read and parse a JSON file, using orjson when it is installed."""
+    with open(path, 'rb') as f:
+        if orjson:
+            return orjson.loads(f.read())
+        return json.load(f)
+
+
+def _dump_json(data, path):
+    """Serialize data to a compact JSON file atomically, using orjson when it is installed."""
+    # Write next to the target and swap it in so a crash never leaves a truncated file
+    tmp_path = path + ".tmp"
+    if orjson:
+        with open(tmp_path, 'wb') as f:
+            f.write(orjson.dumps(data))
+    else:
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+# Names of the default income categories, which older stores may have saved without is_income
+_INCOME_CATEGORY_NAMES = frozenset(data["name"] for data in _DEFAULT_CATEGORIES + _DEFAULT_SUBCATEGORIES
+                                   if data.get("is_income"))
+
+
+class CategoryStore:
+    """Consolidated JSON store keeping all categories of one owner in a single file."""
+    
+    def __init__(self, data_dir="data"):
+        """
+        Initialize a new CategoryStore.
+        
+        Args:
+            data_dir (str): Directory path for stored category data.
+        """
+        self.data_dir = data_dir
+        self.categories_dir = os.path.join(data_dir, "categories")
+    
+    def get_path(self, user_id=None):
+        """
+        Get the path of the consolidated store file.
+        
+        Args:
+            user_id (str, optional): User ID for user-specific categories.
+            
+        Returns:
+            str: Path to categories/<user_id>.json, or categories.json for global categories.
+        """
+        if user_id:
+            return os.path.join(self.categories_dir, f"{user_id}.json")
+        return os.path.join(self.data_dir, "categories.json")
+    
+    def load(self, user_id=None):
+        """
+        Load all categories of an owner with a single read.
+        
+        Args:
+            user_id (str, optional): User ID for user-specific categories.
+            
+        Returns:
+            dict: Category data dictionaries keyed by category_id.
+        """
+        try:
+            return _load_json(self.get_path(user_id))
+        except FileNotFoundError:
+            return self._migrate_legacy_files(user_id)
+        except Exception as e:
+            print(f"Error loading category data: {e}")
+            return {}
+    
+    def load_for_update(self, user_id=None):
+        """
+        Load all categories of an owner before modifying and writing them back.
+        
+        Unlike load, an unreadable store is not treated as empty, so writing the modified data can
+        never replace the categories that could not be read.
+        
+        Args:
+            user_id (str, optional): User ID for user-specific categories.
+            
+        Returns:
+            dict: Category data dictionaries keyed by category_id, or None if the store could not be read.
+        """
+        try:
+            return _load_json(self.get_path(user_id))
+        except FileNotFoundError:
+            return self._migrate_legacy_files(user_id)
+        except Exception as e:
+            print(f"Error loading category data, leaving the store unchanged: {e}")
+            return None
+    
+    def write(self, categories, user_id=None):
+        """
+        Write all categories of an owner with a single dump.
+        
+        Args:
+            categories (dict): Category data dictionaries keyed by category_id.
+            user_id (str, optional): User ID for user-specific categories.
+            
+        Returns:
+            bool: True if writing was successful, False otherwise.
+        """
+        store_file = self.get_path(user_id)
+        _ensure_dir(os.path.dirname(store_file))
+        
+        try:
+            _dump_json(categories, store_file)
+            return True
+        except Exception as e:
+            print(f"Error saving category data: {e}")
+            return False
+    
+    def _migrate_legacy_files(self, user_id=None):
+        """
+        Coalesce the old one-file-per-category layout into the consolidated store.
+        
+        Args:
+            user_id (str, optional): User ID for user-specific categories.
+            
+        Returns:
+            dict: The migrated category data keyed by category_id.
+        """
+        categories = {}
+        
+        legacy_dir = os.path.join(self.categories_dir, user_id) if user_id else self.categories_dir
+        if not os.path.isdir(legacy_dir):
+            return categories
+        
+        legacy_files = []
+        with os.scandir(legacy_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".json") or not entry.is_file():
+                    continue
+                try:
+                    data = _load_json(entry.path)
+                except Exception as e:
+                    print(f"Error loading category data: {e}")
+                    continue
+                
+                # User stores live next to the global shards, only single categories are migrated
+                if isinstance(data, dict) and "category_id" in data:
+                    categories[data["category_id"]] = data
+                    legacy_files.append(entry.path)
+        
+        # The global store is written even when empty so the directory is only scanned once
+        if (categories or not user_id) and self.write(categories, user_id):
+            for file_path in legacy_files:
+                os.remove(file_path)
+            if user_id and not os.listdir(legacy_dir):
+                os.rmdir(legacy_dir)
+        
+        return categories
+
+
+def _get_mtime(path):
+    """Return the modification time of a file in nanoseconds, or None if it does not exist."""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+@functools.lru_cache(maxsize=8)
+def _get_all_categories_cached(user_id, data_dir, include_global, mtime_key):
+    """
+    Load the stored data of the categories available for a user, memoized on the store modification times.
+    
+    Only the data is cached, so every caller can build its own Category instances from it.
+    
+    Args:
+        user_id (str): User ID to filter user-specific categories.
+        data_dir (str): Directory path for stored category data.
+        include_global (bool): Whether to include global categories.
+        mtime_key (tuple): Modification times of the global and user stores.
+        
+    Returns:
+        tuple: A tuple of category data dictionaries.
+    """
+    categories = []
+    store = CategoryStore(data_dir)
+    
+    # Load global categories if requested
+    if include_global:
+        for data in store.load().values():
+            if not data.get("user_id"):  # Ensure it's a global category
+                categories.append(data)
+    
+    # Load user-specific categories if a user_id is provided
+    if user_id:
+        categories.extend(store.load(user_id).values())
+    
+    return tuple(categories)
+
+
+@functools.lru_cache(maxsize=8)
+def _get_parent_index_cached(user_id, data_dir, include_global, mtime_key):
+    """
+    Index the memoized category data by ID, built once per cached load.
+    
+    Takes the same arguments as _get_all_categories_cached.
+    
+    Returns:
+        dict: A dictionary mapping category IDs to (name, parent_id) pairs.
+    """
+    return {data["category_id"]: (data.get("name"), data.get("parent_id"))
+            for data in _get_all_categories_cached(user_id, data_dir, include_global, mtime_key)}
+
+
+def _store_mtime_key(store, user_id):
+    """Return the modification times of the global and user stores, which key the memoized loads."""
+    return (_get_mtime(store.get_path()), _get_mtime(store.get_path(user_id)) if user_id else None)
+
+
+@functools.lru_cache(maxsize=512)
+def _load_cached(category_id, user_id, data_dir):
+    """
+    Look up the stored data of a single category, memoized until the next category write.
+    
+    Args:
+        category_id (str): The ID of the category to load.
+        user_id (str): The user ID if loading a user-specific category.
+        data_dir (str): Directory path for stored category data.
+        
+    Returns:
+        dict: The category data if found, None otherwise.
+    """
+    store = CategoryStore(data_dir)
+    
+    # Check user-specific categories first if a user_id is provided
+    if user_id:
+        data = store.load(user_id).get(category_id)
+        if data:
+            return data
+    
+    # Check global categories
+    return store.load().get(category_id)
 
 
 class Category:
     """Category class for organizing expenses into hierarchical categories."""
     
+    __slots__ = ("name", "category_id", "parent_id", "color", "icon", "_budget", "_budget_display",
+                 "user_id", "created_at", "is_income")
+    
     def __init__(self, name, parent_id=None, category_id=None, color="#3498db", icon=None, 
                  budget=0.0, user_id=None, created_at=None, is_income=False):
         """
@@ -28,7 +369,7 @@ class Category:
             is_income (bool, optional): Whether this category is for income transactions. Defaults to False.
         """
         self.name = name
-        self.category_id = category_id if category_id else str(uuid.uuid4())
+        self.category_id = category_id if category_id else new_id()
         self.parent_id = parent_id
         self.color = color
         self.icon = icon
@@ -37,6 +378,23 @@ class Category:
         self.created_at = created_at if created_at else datetime.now().isoformat()
         self.is_income = is_income
     
+    @property
+    def budget(self):
+        """float: Monthly budget allocated for this category."""
+        return self._budget
+    
+    @budget.setter
+    def budget(self, value):
+        self._budget = value
+        self._budget_display = None
+    
+    @property
+    def budget_display(self):
+        """str: The budget formatted for display, e.g. "$120.00"; formatted once per budget change."""
+        if self._budget_display is None:
+            self._budget_display = f"${self._budget:.2f}"
+        return self._budget_display
+    
     def to_dict(self):
         """
         Convert the category object to a dictionary for serialization.
@@ -81,7 +439,7 @@ class Category:
     
     def save(self, data_dir="data"):
         """
-        Save the category data to a JSON file.
+        Save the category data to the consolidated category store.
         
         Args:
             data_dir (str): Directory path for storing category data.
@@ -89,33 +447,52 @@ class Category:
         Returns:
             bool: True if saving was successful, False otherwise.
         """
-        # Ensure data directory exists
-        os.makedirs(data_dir, exist_ok=True)
+        store = CategoryStore(data_dir)
+        categories = store.load_for_update(self.user_id)
+        if categories is None:
+            return False
         
-        # Create categories directory if it doesn't exist
-        categories_dir = os.path.join(data_dir, "categories")
-        os.makedirs(categories_dir, exist_ok=True)
+        categories[self.category_id] = self.to_dict()
+        Category._invalidate_caches()
+        return store.write(categories, self.user_id)
+    
+    @staticmethod
+    def save_many(categories, data_dir="data"):
+        """
+        Save several categories, loading and writing each affected store once.
         
-        # Determine the file path based on whether it's a user-specific or global category
-        if self.user_id:
-            user_categories_dir = os.path.join(categories_dir, self.user_id)
-            os.makedirs(user_categories_dir, exist_ok=True)
-            category_file = os.path.join(user_categories_dir, f"{self.category_id}.json")
-        else:
-            category_file = os.path.join(categories_dir, f"{self.category_id}.json")
+        Args:
+            categories (iterable): The Category instances to save.
+            data_dir (str): Directory path for storing category data.
+            
+        Returns:
+            bool: True if every save was successful, False otherwise.
+        """
+        # Group the categories by owner, since each owner has its own store file
+        by_user = {}
+        for category in categories:
+            by_user.setdefault(category.user_id, []).append(category)
         
-        try:
-            with open(category_file, 'w') as f:
-                json.dump(self.to_dict(), f, indent=4)
-            return True
-        except Exception as e:
-            print(f"Error saving category data: {e}")
-            return False
+        store = CategoryStore(data_dir)
+        success = True
+        for user_id, user_categories in by_user.items():
+            stored = store.load_for_update(user_id)
+            if stored is None:
+                success = False
+                continue
+            
+            for category in user_categories:
+                stored[category.category_id] = category.to_dict()
+            
+            Category._invalidate_caches()
+            success = store.write(stored, user_id) and success
+        
+        return success
     
     @classmethod
     def load(cls, category_id, user_id=None, data_dir="data"):
         """
-        Load a category from a JSON file.
+        Load a category from the consolidated category store.
         
         Args:
             category_id (str): The ID of the category to load.
@@ -125,28 +502,9 @@ class Category:
         Returns:
             Category: A Category instance if found, None otherwise.
         """
-        categories_dir = os.path.join(data_dir, "categories")
-        
-        # Check user-specific categories first if a user_id is provided
-        if user_id:
-            user_category_file = os.path.join(categories_dir, user_id, f"{category_id}.json")
-            if os.path.exists(user_category_file):
-                try:
-                    with open(user_category_file, 'r') as f:
-                        data = json.load(f)
-                    return cls.from_dict(data)
-                except Exception as e:
-                    print(f"Error loading user category data: {e}")
-        
-        # Check global categories
-        category_file = os.path.join(categories_dir, f"{category_id}.json")
-        if os.path.exists(category_file):
-            try:
-                with open(category_file, 'r') as f:
-                    data = json.load(f)
-                return cls.from_dict(data)
-            except Exception as e:
-                print(f"Error loading category data: {e}")
+        data = _load_cached(category_id, user_id, data_dir)
+        if data:
+            return cls.from_dict(data)
         
         return None
     
@@ -163,34 +521,17 @@ class Category:
         Returns:
             list: A list of Category instances.
         """
-        categories = []
-        categories_dir = os.path.join(data_dir, "categories")
-        
-        # Return empty list if directory doesn't exist
-        if not os.path.exists(categories_dir):
-            return categories
-        
-        # Load global categories if requested
-        if include_global:
-            for filename in os.listdir(categories_dir):
-                if filename.endswith(".json"):
-                    category_id = filename.split(".")[0]
-                    category = Category.load(category_id, data_dir=data_dir)
-                    if category and not category.user_id:  # Ensure it's a global category
-                        categories.append(category)
-        
-        # Load user-specific categories if a user_id is provided
-        if user_id:
-            user_categories_dir = os.path.join(categories_dir, user_id)
-            if os.path.exists(user_categories_dir):
-                for filename in os.listdir(user_categories_dir):
-                    if filename.endswith(".json"):
-                        category_id = filename.split(".")[0]
-                        category = Category.load(category_id, user_id, data_dir)
-                        if category:
-                            categories.append(category)
-        
-        return categories
+        store = CategoryStore(data_dir)
+        mtime_key = _store_mtime_key(store, user_id)
+        return [Category.from_dict(data)
+                for data in _get_all_categories_cached(user_id, data_dir, include_global, mtime_key)]
+    
+    @staticmethod
+    def _invalidate_caches():
+        """Drop the cached category lists and lookups after a write."""
+        _get_all_categories_cached.cache_clear()
+        _get_parent_index_cached.cache_clear()
+        _load_cached.cache_clear()
     
     @staticmethod
     def create_default_categories(user_id=None, data_dir="data"):
@@ -202,120 +543,53 @@ class Category:
             data_dir (str): Directory path for storing category data.
             
         Returns:
-            list: A list of created Category instances.
-        """
-        default_categories = [
-            # Main categories
-            {"name": "Housing", "color": "#e74c3c", "budget": 0, "icon": "home"},
-            {"name": "Transportation", "color": "#3498db", "budget": 0, "icon": "car"},
-            {"name": "Food", "color": "#2ecc71", "budget": 0, "icon": "utensils"},
-            {"name": "Utilities", "color": "#f39c12", "budget": 0, "icon": "bolt"},
-            {"name": "Healthcare", "color": "#9b59b6", "budget": 0, "icon": "medkit"},
-            {"name": "Personal", "color": "#1abc9c", "budget": 0, "icon": "user"},
-            {"name": "Entertainment", "color": "#e67e22", "budget": 0, "icon": "film"},
-            {"name": "Education", "color": "#34495e", "budget": 0, "icon": "graduation-cap"},
-            {"name": "Savings", "color": "#27ae60", "budget": 0, "icon": "piggy-bank"},
-            {"name": "Income", "color": "#16a085", "budget": 0, "icon": "money-bill", "is_income": True},
-        ]
-        
-        # Sub-categories - will be created after main categories
-        subcategories = [
-            # Housing subcategories
-            {"name": "Rent/Mortgage", "parent": "Housing", "icon": "building"},
-            {"name": "Home Insurance", "parent": "Housing", "icon": "shield-alt"},
-            {"name": "Property Tax", "parent": "Housing", "icon": "file-invoice-dollar"},
-            {"name": "Repairs", "parent": "Housing", "icon": "tools"},
-            {"name": "Furniture", "parent": "Housing", "icon": "couch"},
-            
-            # Transportation subcategories
-            {"name": "Car Payment", "parent": "Transportation", "icon": "car-side"},
-            {"name": "Fuel", "parent": "Transportation", "icon": "gas-pump"},
-            {"name": "Insurance", "parent": "Transportation", "icon": "shield-alt"},
-            {"name": "Maintenance", "parent": "Transportation", "icon": "wrench"},
-            {"name": "Public Transit", "parent": "Transportation", "icon": "bus"},
-            
-            # Food subcategories
-            {"name": "Groceries", "parent": "Food", "icon": "shopping-cart"},
-            {"name": "Restaurants", "parent": "Food", "icon": "utensils"},
-            {"name": "Fast Food", "parent": "Food", "icon": "hamburger"},
-            {"name": "Coffee Shops", "parent": "Food", "icon": "coffee"},
-            
-            # Utilities subcategories
-            {"name": "Electricity", "parent": "Utilities", "icon": "bolt"},
-            {"name": "Water", "parent": "Utilities", "icon": "tint"},
-            {"name": "Gas", "parent": "Utilities", "icon": "fire"},
-            {"name": "Internet", "parent": "Utilities", "icon": "wifi"},
-            {"name": "Phone", "parent": "Utilities", "icon": "phone"},
-            
-            # Healthcare subcategories
-            {"name": "Insurance", "parent": "Healthcare", "icon": "shield-alt"},
-            {"name": "Medications", "parent": "Healthcare", "icon": "pills"},
-            {"name": "Doctor", "parent": "Healthcare", "icon": "user-md"},
-            {"name": "Dental", "parent": "Healthcare", "icon": "tooth"},
-            
-            # Personal subcategories
-            {"name": "Clothing", "parent": "Personal", "icon": "tshirt"},
-            {"name": "Gym", "parent": "Personal", "icon": "dumbbell"},
-            {"name": "Haircut", "parent": "Personal", "icon": "cut"},
-            {"name": "Cosmetics", "parent": "Personal", "icon": "spa"},
-            
-            # Entertainment subcategories
-            {"name": "Movies", "parent": "Entertainment", "icon": "film"},
-            {"name": "Music", "parent": "Entertainment", "icon": "music"},
-            {"name": "Games", "parent": "Entertainment", "icon": "gamepad"},
-            {"name": "Streaming Services", "parent": "Entertainment", "icon": "tv"},
-            {"name": "Hobbies", "parent": "Entertainment", "icon": "palette"},
-            
-            # Education subcategories
-            {"name": "Tuition", "parent": "Education", "icon": "university"},
-            {"name": "Books", "parent": "Education", "icon": "book"},
-            {"name": "Courses", "parent": "Education", "icon": "laptop-code"},
-            
-            # Savings subcategories
-            {"name": "Emergency Fund", "parent": "Savings", "icon": "umbrella"},
-            {"name": "Retirement", "parent": "Savings", "icon": "hand-holding-usd"},
-            {"name": "Investments", "parent": "Savings", "icon": "chart-line"},
-            
-            # Income subcategories
-            {"name": "Salary", "parent": "Income", "icon": "briefcase", "is_income": True},
-            {"name": "Bonus", "parent": "Income", "icon": "gift", "is_income": True},
-            {"name": "Interest", "parent": "Income", "icon": "percentage", "is_income": True},
-            {"name": "Dividends", "parent": "Income", "icon": "chart-pie", "is_income": True},
-            {"name": "Freelance", "parent": "Income", "icon": "laptop-code", "is_income": True},
-            {"name": "Rental", "parent": "Income", "icon": "home", "is_income": True},
-        ]
+            list: A list of created Category instances, empty if the existing store could not be read.
+        """
+        store = CategoryStore(data_dir)
+        categories = store.load_for_update(user_id)
+        if categories is None:
+            return []
         
         created_categories = []
         parent_map = {}
         
+        # All defaults are created together, so they share one timestamp
+        created_at = datetime.now().isoformat()
+        
         # Create main categories first
-        for cat_data in default_categories:
+        for cat_data in _DEFAULT_CATEGORIES:
             category = Category(
                 name=cat_data["name"],
                 color=cat_data["color"],
                 icon=cat_data["icon"],
                 budget=cat_data["budget"],
                 user_id=user_id,
+                created_at=created_at,
                 is_income=cat_data.get("is_income", False)
             )
-            category.save(data_dir)
+            categories[category.category_id] = category.to_dict()
             created_categories.append(category)
-            parent_map[cat_data["name"]] = category.category_id
+            parent_map[category.name] = category.category_id
         
         # Create subcategories with parent references
-        for subcat_data in subcategories:
-            if subcat_data["parent"] in parent_map:
-                parent_id = parent_map[subcat_data["parent"]]
+        for subcat_data in _DEFAULT_SUBCATEGORIES:
+            parent_id = parent_map.get(subcat_data["parent"])
+            if parent_id:
                 category = Category(
                     name=subcat_data["name"],
                     parent_id=parent_id,
                     icon=subcat_data["icon"],
                     user_id=user_id,
+                    created_at=created_at,
                     is_income=subcat_data.get("is_income", False)
                 )
-                category.save(data_dir)
+                categories[category.category_id] = category.to_dict()
                 created_categories.append(category)
         
+        # Write all categories to the store at once
+        Category._invalidate_caches()
+        store.write(categories, user_id)
+        
         return created_categories
         
     def get_full_path(self, categories_dict=None, data_dir="data"):
@@ -332,30 +606,117 @@ class Category:
         if not self.parent_id:
             return self.name
         
-        # If categories_dict is not provided, create one for this operation
+        # If categories_dict is not provided, use the index built once per memoized load
         if categories_dict is None:
-            categories = Category.get_all_categories(self.user_id, data_dir)
-            categories_dict = {cat.category_id: cat for cat in categories}
+            store = CategoryStore(data_dir)
+            parent_index = _get_parent_index_cached(self.user_id, data_dir, True,
+                                                    _store_mtime_key(store, self.user_id))
+            lookup = parent_index.get
+        else:
+            def lookup(category_id):
+                parent = categories_dict.get(category_id)
+                return (parent.name, parent.parent_id) if parent else None
         
         path = [self.name]
-        current_cat = self
-        
-        # Traverse up the hierarchy
-        while current_cat.parent_id:
-            parent = categories_dict.get(current_cat.parent_id)
-            if parent:
-                path.append(parent.name)
-                current_cat = parent
-            else:
+        seen = {self.category_id}
+        parent_id = self.parent_id
+        
+        # Traverse up the hierarchy, stopping if a corrupt parent_id loops back
+        while parent_id and parent_id not in seen:
+            entry = lookup(parent_id)
+            if not entry:
                 break
+            name, next_parent_id = entry
+            path.append(name)
+            seen.add(parent_id)
+            parent_id = next_parent_id
         
         # Reverse the path to get parent > child format
         path.reverse()
         return " > ".join(path)
+    
+    @staticmethod
+    def flag_income_categories(categories, data_dir="data"):
+        """
+        Mark the default income categories that aren't flagged as income yet, and save them.
+        
+        Args:
+            categories (list): List of Category instances, updated in place.
+            data_dir (str): Directory path for storing category data.
+            
+        Returns:
+            bool: True if nothing needed saving or saving was successful, False otherwise.
+        """
+        unflagged = [cat for cat in categories if not cat.is_income and cat.name in _INCOME_CATEGORY_NAMES]
+        if not unflagged:
+            return True
+        
+        for cat in unflagged:
+            cat.is_income = True
+        if Category.save_many(unflagged, data_dir):
+            return True
+        
+        # Keep the categories in line with the store when the save failed
+        for cat in unflagged:
+            cat.is_income = False
+        return False
+    
+    @staticmethod
+    def build_path_map(categories):
+        """
+        Build the full hierarchical path of every category in a single pass.
+        
+        Args:
+            categories (list): List of Category instances.
+            
+        Returns:
+            dict: A dictionary mapping category IDs to full paths (e.g., "Food > Groceries").
+        """
+        categories_dict = {cat.category_id: cat for cat in categories}
+        path_map = {}
+        
+        for category in categories_dict.values():
+            # Walk up until reaching a root, a category with a known path, or a loop
+            chain = []
+            seen = set()
+            current_cat = category
+            while current_cat and current_cat.category_id not in path_map and current_cat.category_id not in seen:
+                chain.append(current_cat)
+                seen.add(current_cat.category_id)
+                current_cat = categories_dict.get(current_cat.parent_id) if current_cat.parent_id else None
+            
+            # Resolve the walked chain from the top down, memoizing each intermediate path
+            prefix = path_map.get(current_cat.category_id) if current_cat else None
+            for cat in reversed(chain):
+                prefix = f"{prefix} > {cat.name}" if prefix else cat.name
+                path_map[cat.category_id] = prefix
+        
+        return path_map
+    
+    @staticmethod
+    def group_by_parent(categories):
+        """
+        Split categories into top-level categories and the subcategories of each parent in a single pass.
+        
+        Args:
+            categories (list): List of Category instances.
+            
+        Returns:
+            tuple: The list of categories without a parent, and a dictionary mapping parent IDs to lists
+                of their subcategories, both in the order of the given list.
+        """
+        top_level = []
+        children_by_parent = {}
+        for category in categories:
+            if category.parent_id:
+                children_by_parent.setdefault(category.parent_id, []).append(category)
+            else:
+                top_level.append(category)
+        return top_level, children_by_parent
 
     def delete(self, data_dir="data"):
         """
-        Delete the category data file.
+        Delete the category from the consolidated category store.
         
         Args:
             data_dir (str): Directory path for stored category data.
@@ -363,19 +724,47 @@ class Category:
         Returns:
             bool: True if deletion was successful, False otherwise.
         """
-        categories_dir = os.path.join(data_dir, "categories")
-        
-        # Determine the file path based on whether it's a user-specific or global category
-        if self.user_id:
-            user_categories_dir = os.path.join(categories_dir, self.user_id)
-            category_file = os.path.join(user_categories_dir, f"{self.category_id}.json")
-        else:
-            category_file = os.path.join(categories_dir, f"{self.category_id}.json")
+        store = CategoryStore(data_dir)
+        categories = store.load_for_update(self.user_id)
+        if categories is None:
+            return False
         
-        try:
-            if os.path.exists(category_file):
-                os.remove(category_file)
+        if categories.pop(self.category_id, None) is None:
             return True
-        except Exception as e:
-            print(f"Error deleting category data: {e}")
-            return False
+        
+        Category._invalidate_caches()
+        return store.write(categories, self.user_id)
+    
+    @staticmethod
+    def delete_many(categories, data_dir="data"):
+        """
+        Delete several categories, loading and writing each affected store once.
+        
+        Args:
+            categories (iterable): The Category instances to delete.
+            data_dir (str): Directory path for stored category data.
+            
+        Returns:
+            bool: True if every deletion was successful, False otherwise.
+        """
+        # Group the IDs by owner, since each owner has its own store file
+        ids_by_user = {}
+        for category in categories:
+            ids_by_user.setdefault(category.user_id, []).append(category.category_id)
+        
+        store = CategoryStore(data_dir)
+        success = True
+        for user_id, category_ids in ids_by_user.items():
+            stored = store.load_for_update(user_id)
+            if stored is None:
+                success = False
+                continue
+            
+            removed = [stored.pop(category_id, None) for category_id in category_ids]
+            if not any(data is not None for data in removed):
+                continue
+            
+            Category._invalidate_caches()
+            success = store.write(stored, user_id) and success
+        
+        return success
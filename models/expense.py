@@ -2,15 +2,77 @@
 Expense model for the expense tracking system.
 This module defines the Expense class for managing expense entries.
 """
-import json
+import calendar
 import os
-import uuid
+import re
+import sqlite3
 from datetime import datetime
+from . import expense_db
+from .ids import new_id
+
+# Currency symbols and thousands separators stripped from imported amounts
+_CURRENCY_TRANS = str.maketrans('', '', '$€£,')
+
+# Dates accepted by the CSV importer: YYYY-MM-DD, or day and month followed by the year using / or -
+_DATE_RE = re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2})|(\d{1,2})([/-])(\d{1,2})\5(\d{4})')
+
+
+def _parse_csv_date(date_str):
+    """
+    Convert an imported date to ISO format without going through strptime.
+    
+    Accepts the same formats the importer always has, tried in this order:
+    %Y-%m-%d, %m/%d/%Y, %d/%m/%Y and %d-%m-%Y.
+    
+    Args:
+        date_str (str): The date as written in the CSV file.
+        
+    Returns:
+        str: The date as YYYY-MM-DD, or None if it matches none of the formats.
+    """
+    match = _DATE_RE.fullmatch(date_str)
+    if not match:
+        return None
+    
+    year, month, day, first, separator, second, other_year = match.groups()
+    if year:
+        candidates = ((int(year), int(month), int(day)),)
+    elif separator == "/":
+        candidates = ((int(other_year), int(first), int(second)), (int(other_year), int(second), int(first)))
+    else:
+        candidates = ((int(other_year), int(second), int(first)),)
+    
+    for y, m, d in candidates:
+        try:
+            return datetime(y, m, d).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    return None
+
+
+def _add_months(date_obj, months):
+    """
+    Move a date by a number of months, clamping the day to the length of the target month.
+    
+    Args:
+        date_obj (date): The starting date.
+        months (int): Number of months to add.
+        
+    Returns:
+        date: The shifted date, e.g. Jan 31 + 1 month is Feb 28 (or 29).
+    """
+    year, month = divmod(date_obj.year * 12 + date_obj.month - 1 + months, 12)
+    month += 1
+    day = min(date_obj.day, calendar.monthrange(year, month)[1])
+    return date_obj.replace(year=year, month=month, day=day)
 
 
 class Expense:
     """Expense class for tracking individual expense entries."""
     
+    __slots__ = ("amount", "category_id", "date", "description", "expense_id", "user_id", "payment_method",
+                 "recurring", "recurring_period", "recurring_end_date", "tags", "created_at", "is_income")
+    
     def __init__(self, amount, category_id, date=None, description="", expense_id=None, 
                  user_id=None, payment_method=None, recurring=False, recurring_period=None,
                  recurring_end_date=None, tags=None, created_at=None, is_income=False):
@@ -36,7 +98,7 @@ class Expense:
         self.category_id = category_id
         self.date = date if date else datetime.now().strftime("%Y-%m-%d")
         self.description = description
-        self.expense_id = expense_id if expense_id else str(uuid.uuid4())
+        self.expense_id = expense_id if expense_id else new_id()
         self.user_id = user_id
         self.payment_method = payment_method
         self.recurring = recurring
@@ -96,9 +158,30 @@ class Expense:
             is_income=data.get("is_income", False)
         )
     
+    @classmethod
+    def from_row(cls, row, user_id):
+        """
+        Create an Expense instance straight from a database row.
+        
+        Unpacks the row positionally instead of going through a dictionary and from_dict's lookups,
+        which is the hot path when listing a user's expenses.
+        
+        Args:
+            row (tuple): Values in expense_db.COLUMNS order.
+            user_id (str): The ID of the user who owns the expense.
+            
+        Returns:
+            Expense: A new Expense instance.
+        """
+        (expense_id, amount, category_id, date, description, payment_method, recurring,
+         recurring_period, recurring_end_date, tags, created_at, is_income) = row
+        return cls(amount, category_id, date, description, expense_id, user_id, payment_method,
+                   bool(recurring), recurring_period, recurring_end_date, expense_db.decode_tags(tags),
+                   created_at, bool(is_income))
+    
     def save(self, data_dir="data"):
         """
-        Save the expense data to a JSON file.
+        Save the expense data to the user's expense database.
         
         Args:
             data_dir (str): Directory path for storing expense data.
@@ -110,23 +193,8 @@ class Expense:
             print("Error: Cannot save expense without a user_id")
             return False
         
-        # Ensure data directory exists
-        os.makedirs(data_dir, exist_ok=True)
-        
-        # Create expenses directory if it doesn't exist
-        expenses_dir = os.path.join(data_dir, "expenses")
-        os.makedirs(expenses_dir, exist_ok=True)
-        
-        # Create user-specific expenses directory if it doesn't exist
-        user_expenses_dir = os.path.join(expenses_dir, self.user_id)
-        os.makedirs(user_expenses_dir, exist_ok=True)
-        
-        # Save expense data to a JSON file
-        expense_file = os.path.join(user_expenses_dir, f"{self.expense_id}.json")
-        
         try:
-            with open(expense_file, 'w') as f:
-                json.dump(self.to_dict(), f, indent=4)
+            expense_db.save_expense(self, data_dir)
             return True
         except Exception as e:
             print(f"Error saving expense data: {e}")
@@ -135,7 +203,7 @@ class Expense:
     @classmethod
     def load(cls, expense_id, user_id, data_dir="data"):
         """
-        Load an expense from a JSON file.
+        Load an expense from the user's expense database.
         
         Args:
             expense_id (str): The ID of the expense to load.
@@ -145,18 +213,48 @@ class Expense:
         Returns:
             Expense: An Expense instance if found, None otherwise.
         """
-        expense_file = os.path.join(data_dir, "expenses", user_id, f"{expense_id}.json")
-        
-        if not os.path.exists(expense_file):
-            return None
-        
         try:
-            with open(expense_file, 'r') as f:
-                data = json.load(f)
-            return cls.from_dict(data)
+            data = expense_db.load_expense(expense_id, user_id, data_dir)
         except Exception as e:
             print(f"Error loading expense data: {e}")
             return None
+        
+        return cls.from_dict(data) if data else None
+    
+    @staticmethod
+    def batch_save(user_id, data_dir="data"):
+        """
+        Open a batch for saving many expenses of one user in a single transaction.
+        
+        Usage:
+            with Expense.batch_save(user_id, data_dir) as batch:
+                batch.save(expense)
+        
+        Args:
+            user_id (str): The ID of the user who owns the expenses.
+            data_dir (str): Directory path for storing expense data.
+            
+        Returns:
+            A context manager yielding a writer with save(expense) and save_many(expenses) methods.
+        """
+        return expense_db.batch_save(user_id, data_dir)
+    
+    def delete(self, data_dir="data"):
+        """
+        Delete the expense from the user's expense database.
+        
+        Args:
+            data_dir (str): Directory path for stored expense data.
+            
+        Returns:
+            bool: True if deletion was successful, False otherwise.
+        """
+        try:
+            expense_db.delete_expense(self.expense_id, self.user_id, data_dir)
+            return True
+        except Exception as e:
+            print(f"Error deleting expense data: {e}")
+            return False
     
     @staticmethod
     def get_user_expenses(user_id, data_dir="data", start_date=None, end_date=None, 
@@ -173,44 +271,34 @@ class Expense:
             is_income (bool, optional): Filter by income or expense type.
             
         Returns:
-            list: A list of Expense instances.
+            list: A list of Expense instances, most recent first.
         """
-        expenses = []
-        user_expenses_dir = os.path.join(data_dir, "expenses", user_id)
-        
-        # Return empty list if directory doesn't exist
-        if not os.path.exists(user_expenses_dir):
-            return expenses
-        
-        # Load all expense files
-        for filename in os.listdir(user_expenses_dir):
-            if filename.endswith(".json"):
-                expense_id = filename.split(".")[0]
-                expense = Expense.load(expense_id, user_id, data_dir)
-                
-                if expense:
-                    # Apply filters if specified
-                    include_expense = True
-                    
-                    if start_date and expense.date < start_date:
-                        include_expense = False
-                    
-                    if end_date and expense.date > end_date:
-                        include_expense = False
-                    
-                    if category_id and expense.category_id != category_id:
-                        include_expense = False
-                    
-                    if is_income is not None and expense.is_income != is_income:
-                        include_expense = False
-                    
-                    if include_expense:
-                        expenses.append(expense)
+        return list(Expense.iter_user_expenses(user_id, data_dir, start_date, end_date, category_id, is_income))
+    
+    @staticmethod
+    def iter_user_expenses(user_id, data_dir="data", start_date=None, end_date=None,
+                           category_id=None, is_income=None):
+        """
+        Iterate over the expenses of a specific user without building a list.
         
-        # Sort expenses by date (most recent first)
-        expenses.sort(key=lambda x: x.date, reverse=True)
+        Takes the same arguments as get_user_expenses. Each expense is created only when it is reached,
+        so callers that aggregate in a single pass never hold every expense in memory.
         
-        return expenses
+        Yields:
+            Expense: Expense instances, most recent first.
+        """
+        # Filtering and sorting are done by the database
+        try:
+            for row in expense_db.iter_rows(user_id, data_dir, start_date, end_date, category_id, is_income):
+                # A malformed row is skipped on its own, so it can't cut the rest of the listing short
+                try:
+                    expense = Expense.from_row(row, user_id)
+                except (TypeError, ValueError) as e:
+                    print(f"Skipping malformed expense {row[0]}: {e}")
+                    continue
+                yield expense
+        except sqlite3.Error as e:
+            print(f"Error loading expense data: {e}")
     
     @staticmethod
     def generate_recurring_expenses(user_id, data_dir="data"):
@@ -224,16 +312,21 @@ class Expense:
         Returns:
             list: A list of newly generated Expense instances.
         """
-        from datetime import datetime, timedelta
-        
-        # Get all expenses for the user
-        all_expenses = Expense.get_user_expenses(user_id, data_dir)
-        
-        # Filter to recurring expenses
-        recurring_expenses = [exp for exp in all_expenses if exp.recurring]
-        
-        # Get current date
-        current_date = datetime.now().strftime("%Y-%m-%d")
+        from datetime import date, timedelta
+        
+        # In one pass over the user's expenses, collect the recurring ones and index the most recent
+        # instance of each (description, amount, category); expenses come most recent first, so the
+        # first one seen for a key is the latest
+        recurring_expenses = []
+        latest_instances = {}
+        for exp in Expense.iter_user_expenses(user_id, data_dir):
+            latest_instances.setdefault((exp.description, exp.amount, exp.category_id), exp)
+            if exp.recurring:
+                recurring_expenses.append(exp)
+        
+        # Get current date; stored dates are ISO strings, which compare chronologically
+        today = date.today()
+        current_date = today.isoformat()
         
         new_expenses = []
         
@@ -243,11 +336,8 @@ class Expense:
                 continue
             
             # Get the most recent instance of this recurring expense
-            instances = [exp for exp in all_expenses if exp.description == expense.description 
-                        and exp.amount == expense.amount and exp.category_id == expense.category_id]
-            
-            latest_instance = max(instances, key=lambda x: x.date)
-            latest_date = datetime.strptime(latest_instance.date, "%Y-%m-%d")
+            latest_instance = latest_instances[(expense.description, expense.amount, expense.category_id)]
+            latest_date = date.fromisoformat(latest_instance.date)
             
             # Calculate the next instance date based on the recurring period
             next_date = None
@@ -257,21 +347,17 @@ class Expense:
             elif expense.recurring_period == "weekly":
                 next_date = latest_date + timedelta(weeks=1)
             elif expense.recurring_period == "monthly":
-                # Simple approach for monthly - add same number of days as in a month
-                # This is a simplification and might not always be accurate
-                next_date = latest_date.replace(month=latest_date.month % 12 + 1)
-                if latest_date.month == 12:
-                    next_date = next_date.replace(year=latest_date.year + 1)
+                next_date = _add_months(latest_date, 1)
             elif expense.recurring_period == "yearly":
-                next_date = latest_date.replace(year=latest_date.year + 1)
+                next_date = _add_months(latest_date, 12)
             
             # If next date is due and not in the future
-            if next_date and next_date.strftime("%Y-%m-%d") <= current_date:
+            if next_date and next_date <= today:
                 # Create a new expense instance
                 new_expense = Expense(
                     amount=expense.amount,
                     category_id=expense.category_id,
-                    date=next_date.strftime("%Y-%m-%d"),
+                    date=next_date.isoformat(),
                     description=expense.description,
                     user_id=user_id,
                     payment_method=expense.payment_method,
@@ -282,10 +368,14 @@ class Expense:
                     is_income=expense.is_income
                 )
                 
-                # Save the new expense
-                new_expense.save(data_dir)
                 new_expenses.append(new_expense)
         
+        # Save the new expenses together
+        if new_expenses:
+            with Expense.batch_save(user_id, data_dir) as batch:
+                for new_expense in new_expenses:
+                    batch.save(new_expense)
+        
         return new_expenses
     
     @staticmethod
@@ -313,10 +403,20 @@ class Expense:
             from .category import Category
             categories = Category.get_all_categories(user_id, data_dir)
             category_map = {cat.name.lower(): cat.category_id for cat in categories}
+        else:
+            # Rows are matched on the lowercased category name, so lowercase a caller's keys once
+            category_map = {name.lower(): cid for name, cid in category_map.items()}
+        
+        # Category used for rows whose category is not in the map, resolved once for the whole file
+        default_category_id = next(
+            (cid for name, cid in category_map.items() if name in ("other", "miscellaneous", "general")),
+            next(iter(category_map.values()), None)
+        )
         
-        success_count = 0
         error_count = 0
         error_rows = []
+        expenses = []
+        row_numbers = []
         
         try:
             with open(file_path, 'r', newline='', encoding='utf-8-sig') as csvfile:
@@ -331,31 +431,15 @@ class Expense:
                         description = row.get('Description', '').strip()
                         
                         # Handle date format
-                        try:
-                            # Try various date formats
-                            date_formats = ["%Y-%m-%d", "%m/%d/%Y", "%d/%m/%Y", "%d-%m-%Y"]
-                            date_obj = None
-                            
-                            for fmt in date_formats:
-                                try:
-                                    date_obj = datetime.strptime(date_str, fmt)
-                                    break
-                                except ValueError:
-                                    continue
-                            
-                            if date_obj:
-                                date = date_obj.strftime("%Y-%m-%d")
-                            else:
-                                date = datetime.now().strftime("%Y-%m-%d")
-                                print(f"Warning: Invalid date format in row {i}, using current date")
-                        except Exception:
+                        date = _parse_csv_date(date_str)
+                        if not date:
                             date = datetime.now().strftime("%Y-%m-%d")
                             print(f"Warning: Invalid date format in row {i}, using current date")
                         
                         # Handle amount
                         try:
                             # Remove currency symbols and commas
-                            amount_clean = amount_str.replace('$', '').replace('€', '').replace('£', '').replace(',', '')
+                            amount_clean = amount_str.translate(_CURRENCY_TRANS)
                             amount = float(amount_clean)
                             is_income = amount > 0
                             # Ensure amount is positive for storage
@@ -364,23 +448,11 @@ class Expense:
                             raise ValueError(f"Invalid amount in row {i}: {amount_str}")
                         
                         # Find category ID
-                        category_id = None
-                        if category_name.lower() in category_map:
-                            category_id = category_map[category_name.lower()]
-                        else:
-                            # Use default category
-                            default_categories = [cid for name, cid in category_map.items() 
-                                                if name.lower() in ["other", "miscellaneous", "general"]]
-                            if default_categories:
-                                category_id = default_categories[0]
-                            else:
-                                # Take first category as fallback
-                                if category_map:
-                                    category_id = next(iter(category_map.values()))
-                                else:
-                                    raise ValueError(f"No category found for '{category_name}' in row {i}")
+                        category_id = category_map.get(category_name.lower(), default_category_id)
+                        if category_id is None:
+                            raise ValueError(f"No category found for '{category_name}' in row {i}")
                         
-                        # Create and save expense
+                        # Create the expense; all rows are saved together below
                         expense = Expense(
                             amount=amount,
                             category_id=category_id,
@@ -390,8 +462,8 @@ class Expense:
                             is_income=is_income
                         )
                         
-                        expense.save(data_dir)
-                        success_count += 1
+                        expenses.append(expense)
+                        row_numbers.append(i)
                         
                     except Exception as e:
                         error_count += 1
@@ -400,6 +472,21 @@ class Expense:
         except Exception as e:
             return 0, 1, [(0, f"Error reading CSV file: {str(e)}")]
         
+        try:
+            with Expense.batch_save(user_id, data_dir) as batch:
+                failures = batch.save_many(expenses)
+        except Exception as e:
+            # The rows are saved in a single transaction, so none of them were imported
+            error_rows.append((0, f"Error saving imported expenses: {str(e)}"))
+            return 0, error_count + len(expenses), error_rows
+        
+        # Rows the database rejected are reported like rows that failed to parse
+        for index, message in failures:
+            error_rows.append((row_numbers[index], f"Error saving row {row_numbers[index]}: {message}"))
+        error_rows.sort()
+        success_count = len(expenses) - len(failures)
+        error_count += len(failures)
+        
         return success_count, error_count, error_rows
     
     @staticmethod
@@ -422,33 +509,22 @@ class Expense:
         
         try:
             with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
-                fieldnames = ['Date', 'Amount', 'Category', 'Description', 'Payment Method', 'Tags']
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+                writer = csv.writer(csvfile)
+                writer.writerow(['Date', 'Amount', 'Category', 'Description', 'Payment Method', 'Tags'])
                 
-                writer.writeheader()
+                # Category names if dictionary provided
+                category_names = {cid: cat.name for cid, cat in categories_dict.items()} if categories_dict else {}
                 
-                for expense in expenses:
-                    # Get category name if dictionary provided
-                    category_name = ""
-                    if categories_dict and expense.category_id in categories_dict:
-                        category_name = categories_dict[expense.category_id].name
-                    
-                    # Format amount (negative for expenses, positive for income)
-                    amount = expense.amount
-                    if not expense.is_income:
-                        amount = -amount
-                    
-                    # Format tags
-                    tags_str = ", ".join(expense.tags) if expense.tags else ""
-                    
-                    writer.writerow({
-                        'Date': expense.date,
-                        'Amount': amount,
-                        'Category': category_name,
-                        'Description': expense.description,
-                        'Payment Method': expense.payment_method or "",
-                        'Tags': tags_str
-                    })
+                # Amounts are negative for expenses and positive for income
+                writer.writerows(
+                    (expense.date,
+                     expense.amount if expense.is_income else -expense.amount,
+                     category_names.get(expense.category_id, ""),
+                     expense.description,
+                     expense.payment_method or "",
+                     ", ".join(expense.tags) if expense.tags else "")
+                    for expense in expenses
+                )
                 
             return True
         except Exception as e:
@@ -0,0 +1,421 @@
+"""
+Expense database for the expense tracking system.
+This module stores each user's expenses in a single indexed SQLite database.
+"""
+import json
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to the standard json module
+    orjson = None
+
+
+# Columns of the expenses table, matching the keys of Expense.to_dict() except user_id
+COLUMNS = ("expense_id", "amount", "category_id", "date", "description", "payment_method", "recurring",
+           "recurring_period", "recurring_end_date", "tags", "created_at", "is_income")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS expenses (
+    expense_id TEXT PRIMARY KEY,
+    amount REAL,
+    category_id TEXT,
+    date TEXT,
+    description TEXT,
+    payment_method TEXT,
+    recurring INT,
+    recurring_period TEXT,
+    recurring_end_date TEXT,
+    tags TEXT,
+    created_at TEXT,
+    is_income INT
+);
+CREATE INDEX IF NOT EXISTS idx_date ON expenses(date);
+CREATE INDEX IF NOT EXISTS idx_cat ON expenses(category_id);
+"""
+
+_INSERT = f"INSERT OR REPLACE INTO expenses ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+_SELECT = f"SELECT {', '.join(COLUMNS)} FROM expenses"
+
+# Open connections keyed by database path
+_connections = {}
+
+
+def get_db_path(user_id, data_dir="data"):
+    """
+    Get the path of a user's expense database.
+    
+    Args:
+        user_id (str): The ID of the user.
+        data_dir (str): Directory path for stored expense data.
+        
+    Returns:
+        str: Path to expenses/<user_id>.db.
+    """
+    return os.path.join(data_dir, "expenses", f"{user_id}.db")
+
+
+def get_connection(user_id, data_dir="data"):
+    """
+    Get the open connection to a user's expense database, creating the database if needed.
+    
+    Args:
+        user_id (str): The ID of the user.
+        data_dir (str): Directory path for stored expense data.
+        
+    Returns:
+        sqlite3.Connection: The connection to the user's database.
+    """
+    db_path = get_db_path(user_id, data_dir)
+    conn = _connections.get(db_path)
+    if conn is not None:
+        return conn
+    
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(_SCHEMA)
+    _migrate_legacy_files(conn, user_id, data_dir)
+    
+    _connections[db_path] = conn
+    return conn
+
+
+def _migrate_legacy_files(conn, user_id, data_dir):
+    """
+    Import the old one-file-per-expense JSON layout into the database, then remove the files.
+    
+    Args:
+        conn (sqlite3.Connection): The connection to the user's database.
+        user_id (str): The ID of the user.
+        data_dir (str): Directory path for stored expense data.
+    """
+    legacy_dir = os.path.join(data_dir, "expenses", user_id)
+    if not os.path.isdir(legacy_dir):
+        return
+    
+    with os.scandir(legacy_dir) as entries:
+        paths = [entry.path for entry in entries
+                 if entry.name.endswith(".json") and entry.is_file(follow_symlinks=False)]
+    
+    rows = []
+    legacy_files = []
+    for file_path, data in zip(paths, _bulk_read_jsons(paths)):
+        if data is not None:
+            rows.append(to_row(data))
+            legacy_files.append(file_path)
+    
+    with conn:
+        conn.executemany(_INSERT, rows)
+    
+    for file_path in legacy_files:
+        os.remove(file_path)
+    if not os.listdir(legacy_dir):
+        os.rmdir(legacy_dir)
+
+
+def _dumps(value):
+    """Serialize a value to a JSON string, using orjson when it is installed."""
+    if orjson:
+        return orjson.dumps(value).decode('utf-8')
+    return json.dumps(value)
+
+
+def _loads(text):
+    """Parse a JSON string or bytes, using orjson when it is installed."""
+    if orjson:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def _read_json(path):
+    """Read and parse a single JSON file, returning None if it cannot be read."""
+    try:
+        with open(path, 'rb') as f:
+            return _loads(f.read())
+    except Exception as e:
+        print(f"Error loading expense data: {e}")
+        return None
+
+
+def _bulk_read_jsons(paths):
+    """
+    Read many small JSON files concurrently so their I/O latency overlaps.
+    
+    Args:
+        paths (list): Paths of the JSON files to read.
+        
+    Returns:
+        list: Parsed data for each path in order, None for files that could not be read.
+    """
+    if len(paths) < 2:
+        return [_read_json(path) for path in paths]
+    
+    with ThreadPoolExecutor(max_workers=min(32, len(paths))) as executor:
+        return list(executor.map(_read_json, paths))
+
+
+def to_row(data):
+    """
+    Convert an expense dictionary to a database row.
+    
+    Args:
+        data (dict): Dictionary containing expense data.
+        
+    Returns:
+        tuple: Values in COLUMNS order.
+    """
+    row = []
+    for column in COLUMNS:
+        value = data.get(column)
+        if column == "tags":
+            value = _dumps(value or [])
+        elif column in ("recurring", "is_income"):
+            value = int(bool(value))
+        row.append(value)
+    return tuple(row)
+
+
+def expense_to_row(expense):
+    """
+    Convert an Expense instance to a database row without building an intermediate dictionary.
+    
+    Args:
+        expense (Expense): The expense to convert.
+        
+    Returns:
+        tuple: Values in COLUMNS order.
+    """
+    return (expense.expense_id, expense.amount, expense.category_id, expense.date, expense.description,
+            expense.payment_method, int(bool(expense.recurring)), expense.recurring_period,
+            expense.recurring_end_date, _dumps(expense.tags or []), expense.created_at,
+            int(bool(expense.is_income)))
+
+
+def decode_tags(text):
+    """
+    Decode the tags column of a row.
+    
+    Args:
+        text (str): The stored JSON list, possibly empty or None.
+        
+    Returns:
+        list: The expense's tags.
+    """
+    return _loads(text) if text else []
+
+
+def from_row(row, user_id):
+    """
+    Convert a database row to an expense dictionary.
+    
+    Args:
+        row (tuple): Values in COLUMNS order.
+        user_id (str): The ID of the user who owns the expense.
+        
+    Returns:
+        dict: Dictionary containing expense data.
+    """
+    data = dict(zip(COLUMNS, row))
+    data["user_id"] = user_id
+    data["tags"] = decode_tags(data["tags"])
+    data["recurring"] = bool(data["recurring"])
+    data["is_income"] = bool(data["is_income"])
+    return data
+
+
+def save_expense(expense, data_dir="data"):
+    """
+    Insert or replace an expense.
+    
+    Args:
+        expense (Expense): The expense to save. Its user_id selects the database.
+        data_dir (str): Directory path for stored expense data.
+    """
+    conn = get_connection(expense.user_id, data_dir)
+    with conn:
+        conn.execute(_INSERT, expense_to_row(expense))
+
+
+class _BatchWriter:
+    """Writes expenses on a connection whose transaction is managed by batch_save."""
+    
+    __slots__ = ("conn",)
+    
+    def __init__(self, conn):
+        self.conn = conn
+    
+    def save(self, expense):
+        """
+        Insert or replace an expense as part of the open batch.
+        
+        Args:
+            expense (Expense): The expense to save.
+        """
+        self.conn.execute(_INSERT, expense_to_row(expense))
+    
+    def save_many(self, expenses):
+        """
+        Insert or replace several expenses with a single executemany call.
+        
+        If any expense is rejected, the call is undone and the expenses are inserted one at a time,
+        each under its own savepoint, so only the rejected ones are left out of the batch.
+        
+        Args:
+            expenses (iterable): The expenses to save.
+            
+        Returns:
+            list: (index, message) pairs of the expenses that could not be saved, empty if all were saved.
+        """
+        expenses = list(expenses)
+        conn = self.conn
+        
+        # Savepoints must nest in the batch's transaction; on their own they would commit when released
+        if not conn.in_transaction:
+            conn.execute("BEGIN")
+        
+        conn.execute("SAVEPOINT save_many")
+        try:
+            conn.executemany(_INSERT, map(expense_to_row, expenses))
+            return []
+        except Exception:
+            conn.execute("ROLLBACK TO save_many")
+        finally:
+            conn.execute("RELEASE save_many")
+        
+        failures = []
+        for index, expense in enumerate(expenses):
+            conn.execute("SAVEPOINT save_one")
+            try:
+                conn.execute(_INSERT, expense_to_row(expense))
+            except Exception as e:
+                conn.execute("ROLLBACK TO save_one")
+                failures.append((index, str(e)))
+            finally:
+                conn.execute("RELEASE save_one")
+        return failures
+
+
+@contextmanager
+def batch_save(user_id, data_dir="data"):
+    """
+    Save many expenses of one user in a single transaction.
+    
+    The transaction is committed when the block exits normally and rolled back if it raises.
+    
+    Args:
+        user_id (str): The ID of the user whose database receives the expenses.
+        data_dir (str): Directory path for stored expense data.
+        
+    Yields:
+        _BatchWriter: A writer whose save(expense) adds an expense to the batch, and whose
+            save_many(expenses) adds several, returning the ones that were rejected.
+    """
+    conn = get_connection(user_id, data_dir)
+    with conn:
+        yield _BatchWriter(conn)
+
+
+def load_expense(expense_id, user_id, data_dir="data"):
+    """
+    Load a single expense by its ID.
+    
+    Args:
+        expense_id (str): The ID of the expense to load.
+        user_id (str): The ID of the user who owns the expense.
+        data_dir (str): Directory path for stored expense data.
+        
+    Returns:
+        dict: Dictionary containing expense data if found, None otherwise.
+    """
+    conn = get_connection(user_id, data_dir)
+    row = conn.execute(f"{_SELECT} WHERE expense_id = ?", (expense_id,)).fetchone()
+    return from_row(row, user_id) if row else None
+
+
+def iter_rows(user_id, data_dir="data", start_date=None, end_date=None, category_id=None, is_income=None):
+    """
+    Iterate over the raw rows of a user's expenses with optional filtering, most recent first.
+    
+    Rows are fetched from the cursor as the caller consumes them.
+    
+    Args:
+        user_id (str): The ID of the user.
+        data_dir (str): Directory path for stored expense data.
+        start_date (str, optional): Start date for filtering in ISO format.
+        end_date (str, optional): End date for filtering in ISO format.
+        category_id (str, optional): Category ID for filtering.
+        is_income (bool, optional): Filter by income or expense type.
+        
+    Returns:
+        sqlite3.Cursor: A cursor yielding rows in COLUMNS order.
+    """
+    conditions = []
+    params = []
+    
+    if start_date:
+        conditions.append("date >= ?")
+        params.append(start_date)
+    
+    if end_date:
+        conditions.append("date <= ?")
+        params.append(end_date)
+    
+    if category_id:
+        conditions.append("category_id = ?")
+        params.append(category_id)
+    
+    if is_income is not None:
+        conditions.append("is_income = ?")
+        params.append(int(bool(is_income)))
+    
+    query = _SELECT
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY date DESC"
+    
+    conn = get_connection(user_id, data_dir)
+    return conn.execute(query, params)
+
+
+def iter_expenses(user_id, data_dir="data", start_date=None, end_date=None, category_id=None, is_income=None):
+    """
+    Iterate over a user's expenses with optional filtering, most recent first.
+    
+    Takes the same arguments as iter_rows.
+    
+    Yields:
+        dict: Dictionary containing expense data.
+    """
+    for row in iter_rows(user_id, data_dir, start_date, end_date, category_id, is_income):
+        yield from_row(row, user_id)
+
+
+def query_expenses(user_id, data_dir="data", start_date=None, end_date=None, category_id=None, is_income=None):
+    """
+    Query a user's expenses with optional filtering, most recent first.
+    
+    Takes the same arguments as iter_rows.
+    
+    Returns:
+        list: A list of expense dictionaries.
+    """
+    return list(iter_expenses(user_id, data_dir, start_date, end_date, category_id, is_income))
+
+
+def delete_expense(expense_id, user_id, data_dir="data"):
+    """
+    Delete an expense by its ID.
+    
+    Args:
+        expense_id (str): The ID of the expense to delete.
+        user_id (str): The ID of the user who owns the expense.
+        data_dir (str): Directory path for stored expense data.
+    """
+    conn = get_connection(user_id, data_dir)
+    with conn:
+        conn.execute("DELETE FROM expenses WHERE expense_id = ?", (expense_id,))
@@ -2,16 +2,46 @@
 User model for the expense tracking system.
 This module defines the User class for managing user profiles.
 """
+import functools
 import json
 import os
-import uuid
 import bcrypt
 from datetime import datetime
+from .ids import new_id
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to the standard json module
+    orjson = None
+
+# bcrypt work factor used when hashing new passwords
+BCRYPT_ROUNDS = 12
+
+# Users directories already created by this process
+_ensured_dirs = set()
+
+
+@functools.lru_cache(maxsize=256)
+def _read_user_file(user_file, mtime):
+    """
+    Read and parse a user file, memoized on its path and modification time.
+    
+    Args:
+        user_file (str): Path to the user's JSON file.
+        mtime (int): Modification time of the file in nanoseconds, used only as part of the cache key.
+        
+    Returns:
+        dict: The parsed user data. Callers must not modify it.
+    """
+    with open(user_file, 'rb') as f:
+        return orjson.loads(f.read()) if orjson else json.load(f)
 
 
 class User:
     """User class for managing user profiles in the expense tracking system."""
     
+    __slots__ = ("username", "user_id", "email", "created_at", "preferences", "password_hash")
+    
     def __init__(self, username, password=None, user_id=None, email=None, created_at=None):
         """
         Initialize a new User instance.
@@ -24,7 +54,7 @@ class User:
             created_at (str, optional): Creation timestamp. If not provided, current time will be used.
         """
         self.username = username
-        self.user_id = user_id if user_id else str(uuid.uuid4())
+        self.user_id = user_id if user_id else new_id()
         self.email = email
         self.created_at = created_at if created_at else datetime.now().isoformat()
         self.preferences = {
@@ -45,10 +75,10 @@ class User:
         Args:
             password (str): The plain text password to hash and store.
         """
-        # Hash the password with bcrypt
+        # Hash the password with bcrypt, keeping the hash as bytes for check_password
         password_bytes = password.encode('utf-8')
-        salt = bcrypt.gensalt()
-        self.password_hash = bcrypt.hashpw(password_bytes, salt).decode('utf-8')
+        salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
+        self.password_hash = bcrypt.hashpw(password_bytes, salt)
     
     def check_password(self, password):
         """
@@ -63,9 +93,7 @@ class User:
         if not self.password_hash:
             return False
         
-        password_bytes = password.encode('utf-8')
-        hash_bytes = self.password_hash.encode('utf-8')
-        return bcrypt.checkpw(password_bytes, hash_bytes)
+        return bcrypt.checkpw(password.encode('utf-8'), self.password_hash)
     
     def update_preference(self, key, value):
         """
@@ -88,7 +116,7 @@ class User:
             "user_id": self.user_id,
             "username": self.username,
             "email": self.email,
-            "password_hash": self.password_hash,
+            "password_hash": self.password_hash.decode('utf-8') if self.password_hash else None,
             "created_at": self.created_at,
             "preferences": self.preferences
         }
@@ -110,7 +138,8 @@ class User:
             email=data.get("email"),
             created_at=data.get("created_at")
         )
-        user.password_hash = data.get("password_hash")
+        password_hash = data.get("password_hash")
+        user.password_hash = password_hash.encode('utf-8') if password_hash else None
         user.preferences = data.get("preferences", {})
         return user
     
@@ -124,18 +153,23 @@ class User:
         Returns:
             bool: True if saving was successful, False otherwise.
         """
-        # Ensure data directory exists
-        os.makedirs(data_dir, exist_ok=True)
-        
-        # Create users directory if it doesn't exist
+        # Create the users directory (and data directory) the first time this process saves there
         users_dir = os.path.join(data_dir, "users")
-        os.makedirs(users_dir, exist_ok=True)
+        if users_dir not in _ensured_dirs:
+            os.makedirs(users_dir, exist_ok=True)
+            _ensured_dirs.add(users_dir)
         
         # Save user data to a JSON file
         user_file = os.path.join(users_dir, f"{self.user_id}.json")
         try:
-            with open(user_file, 'w') as f:
-                json.dump(self.to_dict(), f, indent=4)
+            if orjson:
+                with open(user_file, 'wb') as f:
+                    f.write(orjson.dumps(self.to_dict(), option=orjson.OPT_INDENT_2))
+            else:
+                with open(user_file, 'w') as f:
+                    json.dump(self.to_dict(), f, indent=4)
+            # Drop cached reads in case the rewrite kept the same modification time
+            _read_user_file.cache_clear()
             return True
         except Exception as e:
             print(f"Error saving user data: {e}")
@@ -153,17 +187,30 @@ class User:
         Returns:
             User: A User instance if found, None otherwise.
         """
-        user_file = os.path.join(data_dir, "users", f"{user_id}.json")
+        return cls._load_file(os.path.join(data_dir, "users", f"{user_id}.json"))
+    
+    @classmethod
+    def _load_file(cls, user_file):
+        """
+        Load a user from the given JSON file path.
         
+        Args:
+            user_file (str): Path to the user's JSON file.
+            
+        Returns:
+            User: A User instance if the file could be read, None otherwise.
+        """
         try:
-            if os.path.exists(user_file):
-                with open(user_file, 'r') as f:
-                    data = json.load(f)
-                return cls.from_dict(data)
+            data = _read_user_file(user_file, os.stat(user_file).st_mtime_ns)
+            user = cls.from_dict(data)
+            # Give each instance its own preferences so edits never reach the cached data
+            user.preferences = dict(user.preferences)
+            return user
+        except FileNotFoundError:
+            return None
         except Exception as e:
             print(f"Error loading user data: {e}")
-        
-        return None
+            return None
     
     @staticmethod
     def get_all_users(data_dir="data"):
@@ -184,11 +231,11 @@ class User:
             return users
         
         # Load all user files
-        for filename in os.listdir(users_dir):
-            if filename.endswith(".json"):
-                user_id = filename.split(".")[0]
-                user = User.load(user_id, data_dir)
-                if user:
-                    users.append(user)
+        with os.scandir(users_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(".json") and entry.is_file(follow_symlinks=False):
+                    user = User._load_file(entry.path)
+                    if user:
+                        users.append(user)
         
         return users
@@ -4,10 +4,30 @@ This module defines the base UI components and themes.
 """
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
+import functools
 import os
 from PIL import Image, ImageTk
 
 
+@functools.lru_cache(maxsize=256)
+def _load_image_cached(path, size, method, mtime):
+    """
+    Decode, resize and wrap an image, memoized on its path, target size, resampling filter and modification time.
+    
+    The cache also keeps the PhotoImage objects alive, which Tk needs for as long as they are displayed.
+    """
+    image = Image.open(path)
+    if size:
+        # Let JPEG decode at a reduced scale; other formats ignore the hint
+        image.draft(None, size)
+        image = image.resize(size, method)
+    return ImageTk.PhotoImage(image)
+
+
+# ttk styles are shared by every widget, so the common ones only need configuring once
+_STYLES_INITIALIZED = False
+
+
 class BaseFrame(ttk.Frame):
     """Base frame class with common functionality for all frames."""
     
@@ -22,28 +42,65 @@ class BaseFrame(ttk.Frame):
         ttk.Frame.__init__(self, parent, *args, **kwargs)
         self.controller = controller
         self.parent = parent
+        self._rendered_state = None
         self._setup_styles()
     
     def _setup_styles(self):
-        """Set up styles for the frame."""
+        """Set up the common styles, once for the whole application."""
+        global _STYLES_INITIALIZED
+        if _STYLES_INITIALIZED:
+            return
+        
         style = ttk.Style()
         
-        # Configure common styles if they don't exist yet
-        if not style.theme_names() or "expense_tracker" not in style.theme_names():
+        # All styles are sent to Tk in a single theme_settings call
+        style.theme_settings(style.theme_use(), {
             # Frame styles
-            style.configure("Card.TFrame", background="#ffffff", relief="raised", borderwidth=1)
-            style.configure("Sidebar.TFrame", background="#f0f0f0")
+            "Card.TFrame": {"configure": {"background": "#ffffff", "relief": "raised", "borderwidth": 1}},
+            "Sidebar.TFrame": {"configure": {"background": "#f0f0f0"}},
             
             # Label styles
-            style.configure("Title.TLabel", font=("Helvetica", 16, "bold"), background="#ffffff")
-            style.configure("Subtitle.TLabel", font=("Helvetica", 12), background="#ffffff")
-            style.configure("Info.TLabel", font=("Helvetica", 10), background="#ffffff")
+            "Title.TLabel": {"configure": {"font": ("Helvetica", 16, "bold"), "background": "#ffffff"}},
+            "Subtitle.TLabel": {"configure": {"font": ("Helvetica", 12), "background": "#ffffff"}},
+            "Info.TLabel": {"configure": {"font": ("Helvetica", 10), "background": "#ffffff"}},
+            "BoldSmall.TLabel": {"configure": {"font": ("Helvetica", 10, "bold")}},
+            "BoldMed.TLabel": {"configure": {"font": ("Helvetica", 12, "bold")}},
+            "Empty.TLabel": {"configure": {"font": ("Helvetica", 12)}},
+            "Prompt.TLabel": {"configure": {"font": ("Helvetica", 14)}},
+            
+            # Amount styles; positive and negative variants switch a label's colour with one configure call
+            "Money.TLabel": {"configure": {"font": ("Helvetica", 12)}},
+            "Money.Pos.TLabel": {"configure": {"font": ("Helvetica", 12), "foreground": "#2ecc71"}},
+            "Money.Neg.TLabel": {"configure": {"font": ("Helvetica", 12), "foreground": "#e74c3c"}},
+            
+            # Budget usage bars, by how much of the budget is used
+            "Budget.OK.Horizontal.TProgressbar": {"configure": {"background": "#2ecc71"}},
+            "Budget.Warn.Horizontal.TProgressbar": {"configure": {"background": "#f39c12"}},
+            "Budget.Danger.Horizontal.TProgressbar": {"configure": {"background": "#e74c3c"}},
             
             # Button styles
-            style.configure("Primary.TButton", font=("Helvetica", 10), background="#3498db")
-            style.configure("Success.TButton", font=("Helvetica", 10), background="#2ecc71")
-            style.configure("Danger.TButton", font=("Helvetica", 10), background="#e74c3c")
-            style.configure("Link.TLabel", font=("Helvetica", 10, "underline"), foreground="#3498db")
+            "Primary.TButton": {"configure": {"font": ("Helvetica", 10), "background": "#3498db"}},
+            "Success.TButton": {"configure": {"font": ("Helvetica", 10), "background": "#2ecc71"}},
+            "Danger.TButton": {"configure": {"font": ("Helvetica", 10), "background": "#e74c3c"}},
+            "Link.TLabel": {"configure": {"font": ("Helvetica", 10, "underline"), "foreground": "#3498db"}},
+        })
+        
+        _STYLES_INITIALIZED = True
+    
+    def needs_refresh(self):
+        """
+        Check whether stored data or the logged-in user changed since the frame last refreshed.
+        
+        Returns:
+            bool: True if the frame should reload its data, False otherwise.
+        """
+        user = self.controller.current_user
+        state = (self.controller.data_version, user.user_id if user else None)
+        if state == self._rendered_state:
+            return False
+        
+        self._rendered_state = state
+        return True
     
     def show_message(self, title, message, message_type="info"):
         """
@@ -96,22 +153,22 @@ class BaseFrame(ttk.Frame):
         else:
             return filedialog.asksaveasfilename(title=title, filetypes=filetypes, initialdir=initial_dir)
     
-    def load_image(self, path, size=None):
+    def load_image(self, path, size=None, method=Image.BILINEAR):
         """
         Load an image and optionally resize it.
         
         Args:
             path (str): Path to the image file.
             size (tuple, optional): Target size (width, height).
+            method (int, optional): Resampling filter. BILINEAR is indistinguishable from LANCZOS
+                at icon sizes and much cheaper; pass Image.LANCZOS for large photos or
+                Image.NEAREST for pixel art.
             
         Returns:
             ImageTk.PhotoImage: The loaded image.
         """
         try:
-            image = Image.open(path)
-            if size:
-                image = image.resize(size, Image.LANCZOS)
-            return ImageTk.PhotoImage(image)
+            return _load_image_cached(path, tuple(size) if size else None, method, os.stat(path).st_mtime_ns)
         except Exception as e:
             print(f"Error loading image {path}: {e}")
             return None
@@ -148,25 +205,69 @@ class ScrollableFrame(ttk.Frame):
         self.scrollable_frame.bind("<Configure>", self._on_frame_configure)
         self.canvas.bind("<Configure>", self._on_canvas_configure)
         
-        # Bind mousewheel events
-        self.canvas.bind_all("<MouseWheel>", self._on_mousewheel)
-        self.canvas.bind_all("<Button-4>", self._on_mousewheel)
-        self.canvas.bind_all("<Button-5>", self._on_mousewheel)
+        # Wheel ticks received since the last redraw, applied together by _flush_scroll
+        self._pending_scroll = 0
+        self._scroll_after_id = None
+        
+        # Pending scroll region update, so a burst of layout changes recomputes the region once
+        self._region_after_id = None
+        
+        # Bind mousewheel events once for the whole application; the handler routes each event
+        # to the scrollable frame under the pointer, so frames created later don't add handlers
+        root = self._root()
+        if not getattr(root, "_scrollable_wheel_bound", False):
+            root.bind_all("<MouseWheel>", ScrollableFrame._on_mousewheel)
+            root.bind_all("<Button-4>", ScrollableFrame._on_mousewheel)
+            root.bind_all("<Button-5>", ScrollableFrame._on_mousewheel)
+            root._scrollable_wheel_bound = True
     
     def _on_frame_configure(self, event):
+        """Schedule a scroll region update for when the frame has finished changing size."""
+        if self._region_after_id is None:
+            self._region_after_id = self.after_idle(self._update_scroll_region)
+    
+    def _update_scroll_region(self):
         """Update the scroll region based on the frame size."""
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+        self._region_after_id = None
+        if self.winfo_exists():
+            self.canvas.configure(scrollregion=self.canvas.bbox("all"))
     
     def _on_canvas_configure(self, event):
         """Resize the canvas window when the canvas is resized."""
         self.canvas.itemconfig(self.canvas_window, width=event.width)
     
-    def _on_mousewheel(self, event):
-        """Handle mousewheel events for scrolling."""
+    @staticmethod
+    def _on_mousewheel(event):
+        """Handle mousewheel events by scrolling the innermost scrollable frame under the pointer."""
+        try:
+            widget = event.widget.winfo_containing(event.x_root, event.y_root)
+        except (AttributeError, KeyError, tk.TclError):
+            # Event came from, or the pointer is over, a widget tkinter doesn't know about or that was destroyed
+            return
+        
+        while widget is not None and not isinstance(widget, ScrollableFrame):
+            widget = widget.master
+        if widget is None:
+            return
+        
         if event.num == 5 or event.delta < 0:
-            self.canvas.yview_scroll(1, "units")
+            delta = 1
         elif event.num == 4 or event.delta > 0:
-            self.canvas.yview_scroll(-1, "units")
+            delta = -1
+        else:
+            return
+        
+        # Coalesce a burst of ticks into a single scroll once the event queue is idle
+        widget._pending_scroll += delta
+        if widget._scroll_after_id is None:
+            widget._scroll_after_id = widget.after_idle(widget._flush_scroll)
+    
+    def _flush_scroll(self):
+        """Scroll the canvas by all wheel ticks received since the last flush."""
+        self._scroll_after_id = None
+        units, self._pending_scroll = self._pending_scroll, 0
+        if units and self.winfo_exists():
+            self.canvas.yview_scroll(units, "units")
 
 
 class ThemeManager:
@@ -224,36 +325,52 @@ class ThemeManager:
             theme_name = "light"
         
         theme = cls.THEMES[theme_name]
+        
+        # Styles are global to the interpreter, so re-applying the same theme is a no-op
+        if getattr(root, "_applied_theme", None) == theme_name:
+            return theme
+        
         style = ttk.Style()
         
-        # Configure ttk styles
-        style.configure("TFrame", background=theme["bg_primary"])
-        style.configure("TLabel", background=theme["bg_primary"], foreground=theme["fg_primary"])
-        style.configure("TButton", background=theme["accent_color"], foreground=theme["fg_primary"])
-        style.configure("TEntry", fieldbackground=theme["bg_secondary"], foreground=theme["fg_primary"])
-        style.configure("TCombobox", fieldbackground=theme["bg_secondary"], foreground=theme["fg_primary"])
-        
-        # Configure custom styles
-        style.configure("Title.TLabel", font=("Helvetica", 16, "bold"), background=theme["bg_primary"], foreground=theme["fg_primary"])
-        style.configure("Subtitle.TLabel", font=("Helvetica", 12), background=theme["bg_primary"], foreground=theme["fg_primary"])
-        style.configure("Card.TFrame", background=theme["bg_primary"], relief="raised", borderwidth=1)
-        style.configure("Sidebar.TFrame", background=theme["bg_secondary"])
-        
-        # Button variants
-        style.configure("Primary.TButton", background=theme["accent_color"])
-        style.configure("Success.TButton", background=theme["success_color"])
-        style.configure("Danger.TButton", background=theme["danger_color"])
-        style.configure("Link.TLabel", foreground=theme["accent_color"], font=("Helvetica", 10, "underline"))
+        # Configure ttk styles in a single theme_settings call
+        style.theme_settings(style.theme_use(), {
+            "TFrame": {"configure": {"background": theme["bg_primary"]}},
+            "TLabel": {"configure": {"background": theme["bg_primary"], "foreground": theme["fg_primary"]}},
+            "TButton": {"configure": {"background": theme["accent_color"], "foreground": theme["fg_primary"]}},
+            "TEntry": {"configure": {"fieldbackground": theme["bg_secondary"], "foreground": theme["fg_primary"]}},
+            "TCombobox": {"configure": {"fieldbackground": theme["bg_secondary"], "foreground": theme["fg_primary"]}},
+            
+            # Configure custom styles
+            "Title.TLabel": {"configure": {"font": ("Helvetica", 16, "bold"), "background": theme["bg_primary"],
+                                           "foreground": theme["fg_primary"]}},
+            "Subtitle.TLabel": {"configure": {"font": ("Helvetica", 12), "background": theme["bg_primary"],
+                                              "foreground": theme["fg_primary"]}},
+            "Card.TFrame": {"configure": {"background": theme["bg_primary"], "relief": "raised", "borderwidth": 1}},
+            "Sidebar.TFrame": {"configure": {"background": theme["bg_secondary"]}},
+            
+            # Button variants
+            "Primary.TButton": {"configure": {"background": theme["accent_color"]}},
+            "Success.TButton": {"configure": {"background": theme["success_color"]}},
+            "Danger.TButton": {"configure": {"background": theme["danger_color"]}},
+            "Link.TLabel": {"configure": {"foreground": theme["accent_color"], "font": ("Helvetica", 10, "underline")}},
+        })
         
         # Configure the root window
         root.configure(background=theme["bg_primary"])
         
+        # Kept on the root itself, so a new root window never inherits another one's state
+        root._applied_theme = theme_name
         return theme
 
 
 class Tooltip:
     """A tooltip widget that displays text when hovering over a widget."""
     
+    # One hidden window and label shared by every tooltip; only one tooltip is visible at a time
+    _window = None
+    _label = None
+    _owner = None
+    
     def __init__(self, widget, text, delay=500, bg="#ffffea", fg="#000000", x_offset=10, y_offset=10):
         """
         Initialize a new Tooltip.
@@ -274,7 +391,6 @@ class Tooltip:
         self.fg = fg
         self.x_offset = x_offset
         self.y_offset = y_offset
-        self.tooltip_window = None
         self.id = None
         
         self.widget.bind("<Enter>", self.schedule)
@@ -291,15 +407,23 @@ class Tooltip:
         x += self.widget.winfo_rootx() + self.x_offset
         y += self.widget.winfo_rooty() + self.y_offset
         
-        # Create a toplevel window
-        self.tooltip_window = tw = tk.Toplevel(self.widget)
-        tw.wm_overrideredirect(True)  # Remove window decorations
-        tw.wm_geometry(f"+{x}+{y}")
+        # Create the shared toplevel window the first time any tooltip is shown
+        cls = Tooltip
+        if cls._window is None or not cls._window.winfo_exists():
+            cls._window = tk.Toplevel(self.widget.winfo_toplevel())
+            cls._window.wm_overrideredirect(True)  # Remove window decorations
+            cls._window.wm_withdraw()
+            
+            cls._label = tk.Label(cls._window, justify="left", relief="solid", borderwidth=1,
+                                  padx=5, pady=2, wraplength=250)
+            cls._label.pack()
         
-        # Create a label with the tooltip text
-        label = tk.Label(tw, text=self.text, justify="left", background=self.bg, foreground=self.fg,
-                        relief="solid", borderwidth=1, padx=5, pady=2, wraplength=250)
-        label.pack()
+        # Fill in this tooltip's text and show the window next to the widget
+        cls._label.configure(text=self.text, background=self.bg, foreground=self.fg)
+        cls._window.wm_geometry(f"+{x}+{y}")
+        cls._window.wm_deiconify()
+        cls._window.lift()
+        cls._owner = self
     
     def hide(self, event=None):
         """Hide the tooltip."""
@@ -307,6 +431,8 @@ class Tooltip:
             self.widget.after_cancel(self.id)
             self.id = None
         
-        if self.tooltip_window:
-            self.tooltip_window.destroy()
-            self.tooltip_window = None
+        # Only withdraw the shared window if this tooltip is the one showing in it
+        if Tooltip._owner is self:
+            Tooltip._owner = None
+            if Tooltip._window is not None and Tooltip._window.winfo_exists():
+                Tooltip._window.wm_withdraw()
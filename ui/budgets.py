@@ -6,9 +6,17 @@ import tkinter as tk
 from tkinter import ttk
 from datetime import datetime
 import calendar
-from .base import BaseFrame, ScrollableFrame, Tooltip
-from models.category import Category
+from collections import defaultdict
+from operator import attrgetter
+from .base import BaseFrame, Tooltip
 from models.expense import Expense
+from models.category import Category
+
+# Month names for the month selector, and the month number for each name
+_MONTH_NAMES = list(calendar.month_name)[1:]
+_MONTH_INDEX = {name: i for i, name in enumerate(_MONTH_NAMES, start=1)}
+
+_get_budget = attrgetter('budget')
 
 
 class BudgetsFrame(BaseFrame):
@@ -29,14 +37,26 @@ class BudgetsFrame(BaseFrame):
         # Initialize variables
         self.categories = []
         self.category_dict = {}
+        # Categories with a budget, and the "Parent > Child" name shown for each category
+        self.active_categories = []
+        self.display_names = {}
         self.expenses = []
+        self.total_budget = 0
+        # Spending per "YYYY-MM" month, built on first use and kept until the expenses are reloaded
+        self._agg_cache = None
         self.current_month = datetime.now().month
         self.current_year = datetime.now().year
         
+        # Pending after() callback of a debounced view refresh
+        self._refresh_after_id = None
+        
+        # The sidebar and main panel are built the first time the frame is shown
+        self._built = False
+        
         self._create_widgets()
     
     def _create_widgets(self):
-        """Create the budget management widgets."""
+        """Create the frame shell with the navbar; the content area is built by _create_content."""
         # Main container with navbar and content
         container = ttk.Frame(self)
         container.grid(row=0, column=0, sticky="nsew")
@@ -46,8 +66,12 @@ class BudgetsFrame(BaseFrame):
         # Create top navbar
         self._create_navbar(container)
         
+        self._container = container
+    
+    def _create_content(self):
+        """Create the sidebar and main panel below the navbar."""
         # Create content area with sidebar and main panel
-        content = ttk.Frame(container)
+        content = ttk.Frame(self._container)
         content.grid(row=1, column=0, sticky="nsew")
         content.grid_rowconfigure(0, weight=1)
         content.grid_columnconfigure(1, weight=4)
@@ -61,8 +85,9 @@ class BudgetsFrame(BaseFrame):
         self.main_panel.grid_rowconfigure(0, weight=1)
         self.main_panel.grid_columnconfigure(0, weight=1)
         
-        # Show budgets list by default
-        self._show_budgets_list()
+        # Build the budgets list once; refresh_data fills it in
+        self._build_layout()
+        self._built = True
     
     def _create_navbar(self, parent):
         """Create the top navigation bar."""
@@ -99,9 +124,8 @@ class BudgetsFrame(BaseFrame):
         month_frame = ttk.LabelFrame(sidebar, text="Month")
         month_frame.pack(fill="x", pady=10)
         
-        month_names = calendar.month_name[1:]
-        self.month_var = tk.StringVar(value=calendar.month_name[self.current_month])
-        month_combo = ttk.Combobox(month_frame, textvariable=self.month_var, values=month_names, state="readonly")
+        self.month_var = tk.StringVar(value=_MONTH_NAMES[self.current_month - 1])
+        month_combo = ttk.Combobox(month_frame, textvariable=self.month_var, values=_MONTH_NAMES, state="readonly")
         month_combo.pack(fill="x", padx=5, pady=5)
         month_combo.bind("<<ComboboxSelected>>", lambda e: self._update_month())
         
@@ -140,26 +164,18 @@ class BudgetsFrame(BaseFrame):
                            command=self._show_set_budget_dialog)
         add_btn.pack(pady=10, fill="x")
     
-    def _show_budgets_list(self):
-        """Show the budget list with progress in the main panel."""
-        # Clear the main panel
-        for widget in self.main_panel.winfo_children():
-            widget.destroy()
-        
-        # Create scrollable container
-        scrollable = ScrollableFrame(self.main_panel)
-        scrollable.pack(side="top", fill="both", expand=True)
-        container = scrollable.scrollable_frame
+    def _build_layout(self):
+        """Build the budget list widgets once; _show_budgets_list only updates them."""
+        # Plain container; the budgets table below scrolls itself
+        self.list_view = ttk.Frame(self.main_panel)
+        container = self.list_view
         
         # Add header with title
         header_frame = ttk.Frame(container)
         header_frame.pack(pady=10, fill="x", padx=20)
         
-        # Get month name and year
-        month_name = calendar.month_name[self.current_month]
-        
-        title_label = ttk.Label(header_frame, text=f"Budget Management - {month_name} {self.current_year}", 
-                              style="Title.TLabel")
+        self.title_var = tk.StringVar()
+        title_label = ttk.Label(header_frame, textvariable=self.title_var, style="Title.TLabel")
         title_label.pack(side="left")
         
         refresh_btn = ttk.Button(header_frame, text="Refresh", width=10,
@@ -170,150 +186,196 @@ class BudgetsFrame(BaseFrame):
         summary_frame = ttk.Frame(container, style="Card.TFrame", padding=15)
         summary_frame.pack(pady=10, fill="x", padx=20)
         
-        # Calculate total budget and spending
-        total_budget = sum(cat.budget for cat in self.categories if hasattr(cat, 'budget') and cat.budget > 0)
-        total_spending = 0
-        
-        # Filter expenses for current month
-        current_month_str = f"{self.current_year}-{self.current_month:02d}"
-        month_expenses = [e for e in self.expenses if e.date.startswith(current_month_str) and not e.is_income]
-        
-        for expense in month_expenses:
-            total_spending += expense.amount
-        
         # Budget progress
         progress_frame = ttk.Frame(summary_frame)
         progress_frame.pack(fill="x", pady=10)
         
-        ttk.Label(progress_frame, text="Total Budget:", font=("Helvetica", 12, "bold")).grid(row=0, column=0, sticky="w")
-        ttk.Label(progress_frame, text=f"${total_budget:.2f}", font=("Helvetica", 12)).grid(row=0, column=1, padx=10, sticky="w")
+        self.total_budget_var = tk.StringVar()
+        self.total_spending_var = tk.StringVar()
+        self.remaining_var = tk.StringVar()
         
-        ttk.Label(progress_frame, text="Total Spending:", font=("Helvetica", 12, "bold")).grid(row=1, column=0, sticky="w")
-        ttk.Label(progress_frame, text=f"${total_spending:.2f}", font=("Helvetica", 12)).grid(row=1, column=1, padx=10, sticky="w")
+        ttk.Label(progress_frame, text="Total Budget:", style="BoldMed.TLabel").grid(row=0, column=0, sticky="w")
+        ttk.Label(progress_frame, textvariable=self.total_budget_var, style="Money.TLabel").grid(row=0, column=1, padx=10, sticky="w")
         
-        remaining = total_budget - total_spending
-        remaining_color = "#2ecc71" if remaining >= 0 else "#e74c3c"
+        ttk.Label(progress_frame, text="Total Spending:", style="BoldMed.TLabel").grid(row=1, column=0, sticky="w")
+        ttk.Label(progress_frame, textvariable=self.total_spending_var, style="Money.TLabel").grid(row=1, column=1, padx=10, sticky="w")
         
-        ttk.Label(progress_frame, text="Remaining:", font=("Helvetica", 12, "bold")).grid(row=2, column=0, sticky="w")
-        ttk.Label(progress_frame, text=f"${remaining:.2f}", 
-                font=("Helvetica", 12), foreground=remaining_color).grid(row=2, column=1, padx=10, sticky="w")
+        ttk.Label(progress_frame, text="Remaining:", style="BoldMed.TLabel").grid(row=2, column=0, sticky="w")
+        self.remaining_label = ttk.Label(progress_frame, textvariable=self.remaining_var, style="Money.Pos.TLabel")
+        self.remaining_label.grid(row=2, column=1, padx=10, sticky="w")
         
         # Create visual progress bar
-        progress_percent = min(100, (total_spending / total_budget * 100)) if total_budget > 0 else 0
-        
         progress_bar_frame = ttk.Frame(summary_frame)
         progress_bar_frame.pack(fill="x", pady=10)
         
-        ttk.Label(progress_bar_frame, text="Budget Usage:").pack(anchor="w")
-        
-        bar_container = ttk.Frame(progress_bar_frame, height=20, relief="solid", borderwidth=1)
-        bar_container.pack(fill="x", pady=5)
-        
-        # Determine color based on percentage
-        if progress_percent < 75:
-            bar_color = "#2ecc71"  # Green
-        elif progress_percent < 90:
-            bar_color = "#f39c12"  # Orange
-        else:
-            bar_color = "#e74c3c"  # Red
+        usage_header = ttk.Frame(progress_bar_frame)
+        usage_header.pack(fill="x")
         
-        # Create progress bar
-        bar_width = int((progress_percent / 100) * bar_container.winfo_reqwidth())
-        bar = tk.Frame(bar_container, width=bar_width, height=20, background=bar_color)
-        bar.place(x=0, y=0)
+        ttk.Label(usage_header, text="Budget Usage:").pack(side="left")
         
         # Add percentage text
-        percent_label = ttk.Label(bar_container, text=f"{progress_percent:.1f}%", 
-                                font=("Helvetica", 10, "bold"))
-        percent_label.place(relx=0.5, rely=0.5, anchor="center")
+        self.percent_var = tk.StringVar()
+        percent_label = ttk.Label(usage_header, textvariable=self.percent_var, 
+                                style="BoldSmall.TLabel")
+        percent_label.pack(side="right")
+        
+        # The bar's colour comes from its style, which is switched as usage crosses each threshold
+        self.progress_bar = ttk.Progressbar(progress_bar_frame, orient="horizontal", mode="determinate",
+                                            maximum=100, style="Budget.OK.Horizontal.TProgressbar")
+        self.progress_bar.pack(fill="x", pady=5)
         
         # Create category budgets table
         table_frame = ttk.Frame(container, style="Card.TFrame", padding=15)
         table_frame.pack(pady=20, fill="both", expand=True, padx=20)
         
-        table_title = ttk.Label(table_frame, text="Category Budgets", font=("Helvetica", 12, "bold"))
+        table_title = ttk.Label(table_frame, text="Category Budgets", style="BoldMed.TLabel")
         table_title.pack(anchor="w", pady=(0, 10))
         
-        # Create table
+        # Create table; a single Treeview with its own scrollbar fills the card and only draws the rows
+        # in view, so no widgets are created per category
         table = ttk.Frame(table_frame)
         table.pack(fill="both", expand=True)
+        self.table = table
+        
+        edit_btn = ttk.Button(table, text="Edit", width=10,
+                            command=lambda: self._edit_budget_row(self.tree.focus()))
+        edit_btn.pack(side="bottom", anchor="e", pady=(5, 0))
+        
+        self.tree = ttk.Treeview(table, columns=("budget", "spent", "remaining"), show="tree headings",
+                                 selectmode="browse")
+        self.tree.heading("#0", text="Category", anchor="w")
+        self.tree.heading("budget", text="Budget", anchor="w")
+        self.tree.heading("spent", text="Spent", anchor="w")
+        self.tree.heading("remaining", text="Remaining", anchor="w")
+        self.tree.column("#0", width=240, stretch=True)
+        self.tree.column("budget", width=110, anchor="w")
+        self.tree.column("spent", width=110, anchor="w")
+        self.tree.column("remaining", width=110, anchor="w")
+        self.tree.tag_configure("over", foreground="#e74c3c")
+        # Alternate row backgrounds keep rows apart without separator widgets
+        self.tree.tag_configure("odd", background="#f5f5f5")
+        
+        scrollbar = ttk.Scrollbar(table, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
+        
+        # Double-click a row, or select it and press Edit, to change its budget
+        self.tree.bind("<Double-1>", lambda e: self._edit_budget_row(self.tree.identify_row(e.y)))
+        
+        self.no_data_label = ttk.Label(table_frame, text="No budget data found. Click 'Set Budget' to add budgets.",
+                                     style="Empty.TLabel")
+        
+        # Shown instead of the list when nobody is logged in
+        self.login_view = ttk.Frame(self.main_panel)
+        
+        message = ttk.Label(self.login_view, text="Please log in to manage budgets", 
+                          style="Prompt.TLabel")
+        message.pack(pady=50)
+        
+        login_btn = ttk.Button(self.login_view, text="Go to Login", 
+                             command=lambda: self.controller.show_frame("LoginFrame"))
+        login_btn.pack()
+    
+    def _show_budgets_list(self):
+        """Show the budget list with progress in the main panel."""
+        self.login_view.pack_forget()
+        self.list_view.pack(side="top", fill="both", expand=True)
         
-        # Configure columns
-        table.columnconfigure(0, weight=3)  # Category
-        table.columnconfigure(1, weight=2)  # Budget
-        table.columnconfigure(2, weight=2)  # Spent
-        table.columnconfigure(3, weight=2)  # Remaining
-        table.columnconfigure(4, weight=1)  # Actions
+        # Get month name and year
+        month_name = _MONTH_NAMES[self.current_month - 1]
+        self.title_var.set(f"Budget Management - {month_name} {self.current_year}")
         
-        # Headers
-        ttk.Label(table, text="Category", font=("Helvetica", 10, "bold")).grid(row=0, column=0, sticky="w", padx=5, pady=5)
-        ttk.Label(table, text="Budget", font=("Helvetica", 10, "bold")).grid(row=0, column=1, sticky="w", padx=5, pady=5)
-        ttk.Label(table, text="Spent", font=("Helvetica", 10, "bold")).grid(row=0, column=2, sticky="w", padx=5, pady=5)
-        ttk.Label(table, text="Remaining", font=("Helvetica", 10, "bold")).grid(row=0, column=3, sticky="w", padx=5, pady=5)
-        ttk.Label(table, text="Actions", font=("Helvetica", 10, "bold")).grid(row=0, column=4, sticky="w", padx=5, pady=5)
+        # Get total budget and spending
+        total_budget = self.total_budget
+        category_spending, total_spending = self._get_month_spending()
         
-        ttk.Separator(table, orient="horizontal").grid(row=1, column=0, columnspan=5, sticky="ew", pady=5)
+        # Budget progress
+        remaining = total_budget - total_spending
         
-        # Filter categories based on view option
-        filtered_categories = self.categories
-        if self.view_var.get() == "active":
-            filtered_categories = [cat for cat in self.categories if hasattr(cat, 'budget') and cat.budget > 0]
+        self.total_budget_var.set(f"${total_budget:.2f}")
+        self.total_spending_var.set(f"${total_spending:.2f}")
+        self.remaining_var.set(f"${remaining:.2f}")
+        self.remaining_label.configure(style="Money.Pos.TLabel" if remaining >= 0 else "Money.Neg.TLabel")
         
-        # Calculate spending by category
-        category_spending = {}
-        for expense in month_expenses:
-            if expense.category_id not in category_spending:
-                category_spending[expense.category_id] = 0
-            category_spending[expense.category_id] += expense.amount
+        # Update visual progress bar
+        progress_percent = min(100, (total_spending / total_budget * 100)) if total_budget > 0 else 0
+        
+        # Determine color based on percentage
+        if progress_percent < 75:
+            bar_style = "Budget.OK.Horizontal.TProgressbar"  # Green
+        elif progress_percent < 90:
+            bar_style = "Budget.Warn.Horizontal.TProgressbar"  # Orange
+        else:
+            bar_style = "Budget.Danger.Horizontal.TProgressbar"  # Red
+        
+        self.progress_bar.configure(value=progress_percent, style=bar_style)
+        self.percent_var.set(f"{progress_percent:.1f}%")
+        
+        # Filter categories based on view option
+        filtered_categories = self.active_categories if self.view_var.get() == "active" else self.categories
         
         # Display categories
+        self.tree.delete(*self.tree.get_children())
+        for i, category in enumerate(filtered_categories):
+            # Get budget and spending
+            budget = category.budget
+            spent = category_spending.get(category.category_id, 0)
+            remaining = budget - spent
+            
+            # Display in table, striping alternate rows and highlighting categories over budget
+            tags = ("odd",) if i % 2 else ()
+            if remaining < 0:
+                tags += ("over",)
+            self.tree.insert("", "end", iid=category.category_id, text=self.display_names[category.category_id],
+                             values=(f"${budget:.2f}", f"${spent:.2f}", f"${remaining:.2f}"), tags=tags)
+        
         if filtered_categories:
-            for i, category in enumerate(filtered_categories):
-                # Get category full path if it's a subcategory
-                category_name = category.name
-                if category.parent_id and category.parent_id in self.category_dict:
-                    parent = self.category_dict[category.parent_id]
-                    category_name = f"{parent.name} > {category.name}"
-                
-                # Get budget and spending
-                budget = category.budget if hasattr(category, 'budget') else 0
-                spent = category_spending.get(category.category_id, 0)
-                remaining = budget - spent
-                
-                # Set colors
-                spent_color = "#000000"  # Default
-                remaining_color = "#2ecc71" if remaining >= 0 else "#e74c3c"
-                
-                # Display in table
-                ttk.Label(table, text=category_name).grid(row=i+2, column=0, sticky="w", padx=5, pady=2)
-                ttk.Label(table, text=f"${budget:.2f}").grid(row=i+2, column=1, sticky="w", padx=5, pady=2)
-                ttk.Label(table, text=f"${spent:.2f}", foreground=spent_color).grid(row=i+2, column=2, sticky="w", padx=5, pady=2)
-                ttk.Label(table, text=f"${remaining:.2f}", foreground=remaining_color).grid(row=i+2, column=3, sticky="w", padx=5, pady=2)
-                
-                # Actions
-                actions_frame = ttk.Frame(table)
-                actions_frame.grid(row=i+2, column=4, sticky="w", padx=5, pady=2)
-                
-                edit_btn = ttk.Button(actions_frame, text="Edit", width=5,
-                                    command=lambda c=category: self._show_edit_budget_dialog(c))
-                edit_btn.pack(side="left", padx=2)
-                
-                # Add separator between rows
-                if i < len(filtered_categories) - 1:
-                    ttk.Separator(table, orient="horizontal").grid(row=i+3, column=0, columnspan=5, sticky="ew", pady=2)
+            self.no_data_label.pack_forget()
         else:
-            no_data_label = ttk.Label(table, text="No budget data found. Click 'Set Budget' to add budgets.",
-                                    font=("Helvetica", 12))
-            no_data_label.grid(row=2, column=0, columnspan=5, pady=20)
+            self.no_data_label.pack(pady=20, before=self.table)
+    
+    def _edit_budget_row(self, category_id):
+        """
+        Open the edit dialog for a row of the budgets table.
+        
+        Args:
+            category_id (str): ID of the row's category; empty when no row was hit or selected.
+        """
+        category = self.category_dict.get(category_id) if category_id else None
+        if category:
+            self._show_edit_budget_dialog(category)
+    
+    def _get_month_spending(self):
+        """
+        Get the spending of the selected month.
+        
+        The first call after the expenses are loaded buckets every expense by month in a single pass,
+        so switching months afterwards is a dictionary lookup rather than a rescan.
+        
+        Returns:
+            tuple: (spending by category ID, total spending)
+        """
+        if self._agg_cache is None:
+            category_spending = defaultdict(lambda: defaultdict(float))
+            total_spending = defaultdict(float)
+            
+            # The "YYYY-MM" prefix of an ISO date is the month key
+            for expense in self.expenses:
+                if expense.is_income or not expense.date:
+                    continue
+                month = expense.date[:7]
+                category_spending[month][expense.category_id] += expense.amount
+                total_spending[month] += expense.amount
+            
+            self._agg_cache = {month: (dict(spending), total_spending[month])
+                               for month, spending in category_spending.items()}
+        
+        return self._agg_cache.get(f"{self.current_year}-{self.current_month:02d}", ({}, 0.0))
     
     def _update_month(self):
         """Update the selected month and refresh the view."""
-        month_name = self.month_var.get()
-        for i, name in enumerate(calendar.month_name):
-            if name == month_name:
-                self.current_month = i
-                break
-        
+        self.current_month = _MONTH_INDEX.get(self.month_var.get(), self.current_month)
         self._refresh_view()
     
     def _previous_year(self):
@@ -329,8 +391,21 @@ class BudgetsFrame(BaseFrame):
         self._refresh_view()
     
     def _refresh_view(self):
-        """Refresh the current view."""
-        self._show_budgets_list()
+        """Refresh the current view once a burst of month/year/view changes has settled."""
+        self._cancel_pending_refresh()
+        self._refresh_after_id = self.after(150, self._do_refresh)
+    
+    def _do_refresh(self):
+        """Run the debounced view refresh."""
+        self._refresh_after_id = None
+        if self.winfo_exists():
+            self._show_budgets_list()
+    
+    def _cancel_pending_refresh(self):
+        """Cancel a debounced view refresh that has not run yet."""
+        if self._refresh_after_id is not None:
+            self.after_cancel(self._refresh_after_id)
+            self._refresh_after_id = None
     
     def _show_set_budget_dialog(self):
         """Show dialog for setting a category budget."""
@@ -393,7 +468,7 @@ class BudgetsFrame(BaseFrame):
         frame.pack(fill="both", expand=True)
         
         # Category info
-        ttk.Label(frame, text="Category:", font=("Helvetica", 10, "bold")).grid(row=0, column=0, sticky="w", pady=5)
+        ttk.Label(frame, text="Category:", style="BoldSmall.TLabel").grid(row=0, column=0, sticky="w", pady=5)
         ttk.Label(frame, text=category.name).grid(row=0, column=1, sticky="w", pady=5)
         
         # Budget amount
@@ -428,6 +503,7 @@ class BudgetsFrame(BaseFrame):
         category.budget = budget_value
         
         if category.save(self.controller.data_dir):
+            self.controller.mark_data_changed()
             dialog.destroy()
             self.refresh_data()
             self.show_message("Success", "Budget updated successfully", "info")
@@ -448,6 +524,7 @@ class BudgetsFrame(BaseFrame):
         category.budget = budget_value
         
         if category.save(self.controller.data_dir):
+            self.controller.mark_data_changed()
             dialog.destroy()
             self.refresh_data()
             self.show_message("Success", "Budget updated successfully", "info")
@@ -458,39 +535,44 @@ class BudgetsFrame(BaseFrame):
         """Refresh the category and expense data and view."""
         if self.controller.current_user:
             user_id = self.controller.current_user.user_id
-            self.categories = Category.get_all_categories(user_id, self.controller.data_dir)
-            self.category_dict = {cat.category_id: cat for cat in self.categories}
+            self.categories = self.controller.categories
+            self.category_dict = self.controller.categories_by_id
             self.expenses = Expense.get_user_expenses(user_id, self.controller.data_dir)
             
-            # Refresh view
-            self._refresh_view()
+            # Work out what the table needs from the categories once, not on every redraw
+            self.active_categories = [cat for cat in self.categories if cat.budget > 0]
+            self.total_budget = sum(map(_get_budget, self.active_categories))
+            self.display_names = Category.build_path_map(self.categories)
+            self._agg_cache = None
+            
+            # Refresh view right away, superseding any pending debounced refresh
+            self._cancel_pending_refresh()
+            self._show_budgets_list()
         else:
             self.categories = []
             self.category_dict = {}
+            self.active_categories = []
+            self.display_names = {}
             self.expenses = []
+            self.total_budget = 0
+            self._agg_cache = None
+            self._cancel_pending_refresh()
             
             # Show login message
-            for widget in self.main_panel.winfo_children():
-                widget.destroy()
-            
-            container = ttk.Frame(self.main_panel)
-            container.pack(fill="both", expand=True)
-            
-            message = ttk.Label(container, text="Please log in to manage budgets", 
-                              font=("Helvetica", 14))
-            message.pack(pady=50)
-            
-            login_btn = ttk.Button(container, text="Go to Login", 
-                                 command=lambda: self.controller.show_frame("LoginFrame"))
-            login_btn.pack()
+            self.list_view.pack_forget()
+            self.login_view.pack(fill="both", expand=True)
     
     def on_show_frame(self):
         """Called when the frame is shown."""
+        if not self._built:
+            self._create_content()
+        
         # Update user info
         if self.controller.current_user:
             self.user_var.set(f"Welcome, {self.controller.current_user.username}")
         else:
             self.user_var.set("Welcome, User")
         
-        # Refresh data
-        self.refresh_data()
+        # Refresh data if it changed since the last time the frame was shown
+        if self.needs_refresh():
+            self.refresh_data()
@@ -4,10 +4,130 @@ This module provides UI components for creating and managing expense categories.
 """
 import tkinter as tk
 from tkinter import ttk
+import queue
 import random
-from .base import BaseFrame, ScrollableFrame, Tooltip
+import re
+import threading
+from functools import lru_cache
+from .base import BaseFrame, Tooltip
 from models.category import Category
 
+# Size in pixels of the color swatch drawn next to each category
+_SWATCH_SIZE = 12
+
+# Two-digit hex string of every channel value, for building "#rrggbb" colors
+_HEX = tuple(f"{i:02x}" for i in range(256))
+
+# Budget text that can still be completed into a number while typing, and a complete budget
+_PARTIAL_BUDGET_RE = re.compile(r"-?\d*\.?\d*")
+_BUDGET_RE = re.compile(r"-?(\d+\.?\d*|\.\d+)")
+
+
+@lru_cache(maxsize=512)
+def _hex_to_rgb(color):
+    """
+    Parse a "#rrggbb" color.
+    
+    Args:
+        color (str): The color, with or without the leading "#".
+        
+    Returns:
+        tuple: The (red, green, blue) components as integers.
+    """
+    color = color.lstrip('#')
+    return int(color[0:2], 16), int(color[2:4], 16), int(color[4:6], 16)
+
+
+class _CategoryDialog:
+    """The add/edit category dialog, built once and shown again for every add or edit."""
+    
+    __slots__ = ("window", "name_label", "name_var", "name_entry", "budget_var", "color_var", "color_preview",
+                 "save_btn")
+    
+    def __init__(self, owner):
+        """
+        Build the dialog, initially hidden.
+        
+        Args:
+            owner (CategoriesFrame): The frame the dialog belongs to.
+        """
+        self.window = tk.Toplevel(owner)
+        self.window.withdraw()
+        self.window.geometry("400x350")
+        self.window.resizable(False, False)
+        self.window.transient(owner)
+        self.window.protocol("WM_DELETE_WINDOW", self.hide)
+        
+        # Create form
+        frame = ttk.Frame(self.window, padding=20)
+        frame.pack(fill="both", expand=True)
+        
+        # Category name
+        self.name_label = ttk.Label(frame, text="Category Name:")
+        self.name_label.grid(row=0, column=0, sticky="w", pady=5)
+        self.name_var = tk.StringVar()
+        self.name_entry = ttk.Entry(frame, textvariable=self.name_var, width=30)
+        self.name_entry.grid(row=0, column=1, sticky="ew", pady=5)
+        
+        # Budget
+        ttk.Label(frame, text="Budget:").grid(row=1, column=0, sticky="w", pady=5)
+        self.budget_var = tk.StringVar()
+        # Reject keystrokes that can't lead to a number, so Save only has to check for completeness
+        validate_budget = (self.window.register(lambda text: _PARTIAL_BUDGET_RE.fullmatch(text) is not None), "%P")
+        budget_entry = ttk.Entry(frame, textvariable=self.budget_var, width=30,
+                                 validate="key", validatecommand=validate_budget)
+        budget_entry.grid(row=1, column=1, sticky="ew", pady=5)
+        
+        # Color
+        ttk.Label(frame, text="Color:").grid(row=2, column=0, sticky="w", pady=5)
+        self.color_var = tk.StringVar()
+        
+        self.color_preview = tk.Frame(frame, width=30, height=30)
+        self.color_preview.grid(row=2, column=1, sticky="w", pady=5)
+        
+        color_btn = ttk.Button(frame, text="Select Color", 
+                             command=lambda: owner._choose_color(self.color_var, self.color_preview))
+        color_btn.grid(row=2, column=1, sticky="e", pady=5)
+        
+        # Buttons
+        btn_frame = ttk.Frame(frame)
+        btn_frame.grid(row=4, column=0, columnspan=2, pady=20)
+        
+        self.save_btn = ttk.Button(btn_frame, text="Save")
+        self.save_btn.pack(side="left", padx=5)
+        
+        cancel_btn = ttk.Button(btn_frame, text="Cancel", command=self.hide)
+        cancel_btn.pack(side="left", padx=5)
+    
+    def show(self, title, name_label, name, budget, color, on_save):
+        """
+        Fill the form in and show the dialog modally.
+        
+        Args:
+            title (str): Window title.
+            name_label (str): Label of the name field.
+            name (str): Initial name.
+            budget (str): Initial budget.
+            color (str): Initial color.
+            on_save (callable): Called without arguments when Save is pressed.
+        """
+        self.window.title(title)
+        self.name_label.configure(text=name_label)
+        self.name_var.set(name)
+        self.budget_var.set(budget)
+        self.color_var.set(color)
+        self.color_preview.configure(bg=color)
+        self.save_btn.configure(command=on_save)
+        
+        self.window.deiconify()
+        self.window.grab_set()
+        self.name_entry.focus_set()
+    
+    def hide(self):
+        """Hide the dialog, keeping its widgets for the next time it is shown."""
+        self.window.grab_release()
+        self.window.withdraw()
+
 
 class CategoriesFrame(BaseFrame):
     """Main frame for managing expense categories."""
@@ -27,7 +147,38 @@ class CategoriesFrame(BaseFrame):
         # Initialize variables
         self.categories = []
         self.category_dict = {}
-        self.parent_categories = {}
+        # Subcategories of each category, and the categories without a parent, in store order; rows are
+        # always shown in the order of _get_sorted_index, never straight from these
+        self._children_by_parent = {}
+        self._standalone = []
+        # Lowercased name of each category, for searching and sorting
+        self._name_keys = {}
+        # (category, subcategories) pairs left by the filters, in display order
+        self._filtered_items = []
+        
+        # Standalone categories and subcategories sorted per sort option, kept until the data changes
+        self._sorted_index = {}
+        
+        # Pending after() callback of a debounced search
+        self._search_after_id = None
+        
+        # Categories read from disk by a background reload, and the user they were read for
+        self._load_queue = queue.Queue()
+        self._loading_user_id = None
+        
+        # Add/edit dialog, built on first use and reused afterwards
+        self._category_dialog = None
+        
+        # Categories whose subcategories are shown; the others get their rows on first expand
+        self._expanded = set()
+        # Categories expanded only because the current search matches some of their subcategories
+        self._search_expanded = set()
+        
+        # Color swatch images shown in the tree, one per color
+        self._swatches = {}
+        
+        # What the tree showed on the last render, to skip renders that would change nothing
+        self._last_render_keys = None
         
         self._create_widgets()
     
@@ -57,7 +208,8 @@ class CategoriesFrame(BaseFrame):
         self.main_panel.grid_rowconfigure(0, weight=1)
         self.main_panel.grid_columnconfigure(0, weight=1)
         
-        # Show categories list by default
+        # Build the categories list once and show it by default
+        self._build_layout()
         self._show_categories_list()
     
     def _create_navbar(self, parent):
@@ -97,7 +249,7 @@ class CategoriesFrame(BaseFrame):
         add_btn.pack(pady=5, fill="x")
         
         # Filter section
-        filter_label = ttk.Label(sidebar, text="Filter Categories", font=("Helvetica", 12, "bold"))
+        filter_label = ttk.Label(sidebar, text="Filter Categories", style="BoldMed.TLabel")
         filter_label.pack(anchor="w", pady=(20, 10))
         
         # View options
@@ -128,16 +280,11 @@ class CategoriesFrame(BaseFrame):
                                       variable=self.sort_var, command=self._apply_filters)
         budget_radio.pack(anchor="w", padx=5, pady=2)
     
-    def _show_categories_list(self):
-        """Show the categories list in the main panel."""
-        # Clear the main panel
-        for widget in self.main_panel.winfo_children():
-            widget.destroy()
-        
-        # Create scrollable container
-        scrollable = ScrollableFrame(self.main_panel)
-        scrollable.pack(side="top", fill="both", expand=True)
-        container = scrollable.scrollable_frame
+    def _build_layout(self):
+        """Build the categories list widgets once; _show_categories_list only updates them."""
+        # The tree scrolls itself, so the panel needs no scrollable container
+        container = ttk.Frame(self.main_panel)
+        container.pack(side="top", fill="both", expand=True)
         
         # Add header with title and search
         header_frame = ttk.Frame(container)
@@ -151,7 +298,7 @@ class CategoriesFrame(BaseFrame):
         search_frame.pack(side="right")
         
         self.search_var = tk.StringVar()
-        self.search_var.trace("w", lambda name, index, mode: self._apply_filters())
+        self.search_var.trace_add("write", lambda name, index, mode: self._schedule_search())
         
         search_entry = ttk.Entry(search_frame, textvariable=self.search_var, width=20)
         search_entry.pack(side="left", padx=5)
@@ -159,299 +306,230 @@ class CategoriesFrame(BaseFrame):
         search_btn = ttk.Button(search_frame, text="Search", command=self._apply_filters)
         search_btn.pack(side="left")
         
-        # Create categories container
-        categories_frame = ttk.Frame(container, padding=10)
-        categories_frame.pack(pady=10, fill="both", expand=True, padx=20)
-        
-        # Display categories as cards
-        if self.categories:
-            # Group categories by parent
-            categorized = {}
-            standalone = []
-            
-            for category in self.categories:
-                if not category.parent_id:
-                    standalone.append(category)
-                else:
-                    if category.parent_id not in categorized:
-                        categorized[category.parent_id] = []
-                    categorized[category.parent_id].append(category)
-            
-            # Add standalone categories first
-            for i, category in enumerate(standalone):
-                # Create a card for this category
-                self._create_category_card(categories_frame, category, i, categorized.get(category.category_id, []))
-        else:
-            no_data_label = ttk.Label(categories_frame, text="No categories found",
-                                     font=("Helvetica", 12))
-            no_data_label.pack(pady=20)
-        
-        # Add button at the bottom
+        # Add button at the bottom, packed before the table so the table gets the remaining height
         bottom_frame = ttk.Frame(container)
-        bottom_frame.pack(pady=10, fill="x", padx=20)
+        bottom_frame.pack(side="bottom", pady=10, fill="x", padx=20)
         
         add_btn = ttk.Button(bottom_frame, text="Add New Category", 
                            command=self._show_add_category_dialog)
         add_btn.pack(side="left")
         
         refresh_btn = ttk.Button(bottom_frame, text="Refresh", 
-                               command=self.refresh_data)
+                               command=self._reload_categories)
         refresh_btn.pack(side="right")
-    
-    def _create_category_card(self, parent, category, index, subcategories=None):
-        """Create a card for displaying a category and its subcategories."""
-        # Create a card frame
-        card = ttk.Frame(parent, style="Card.TFrame", padding=10)
-        card.pack(fill="x", pady=5)
         
-        # Top section with category info
-        top_frame = ttk.Frame(card)
-        top_frame.pack(fill="x")
-        
-        # Category color indicator
-        color_indicator = tk.Frame(top_frame, width=20, height=20, background=category.color)
-        color_indicator.pack(side="left", padx=(0, 10))
-        
-        # Category name
-        name_label = ttk.Label(top_frame, text=category.name, font=("Helvetica", 12, "bold"))
-        name_label.pack(side="left")
+        self.loading_label = ttk.Label(bottom_frame, text="Loading…")
+        
+        # Create categories table; a single Treeview with its own scrollbar fills the panel and only
+        # draws the rows in view, however many categories there are
+        table = ttk.Frame(container, padding=10)
+        table.pack(pady=10, fill="both", expand=True, padx=20)
+        
+        actions_frame = ttk.Frame(table)
+        actions_frame.pack(side="bottom", anchor="e", pady=(5, 0))
+        
+        self.tree_frame = ttk.Frame(table)
+        self.tree_frame.pack(fill="both", expand=True)
+        
+        self.tree = ttk.Treeview(self.tree_frame, columns=("budget",), show="tree headings", selectmode="browse")
+        self.tree.heading("#0", text="Category", anchor="w")
+        self.tree.heading("budget", text="Budget", anchor="w")
+        self.tree.column("#0", width=300, stretch=True)
+        self.tree.column("budget", width=120, anchor="w")
+        
+        scrollbar = ttk.Scrollbar(self.tree_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
+        self.tree.bind("<<TreeviewOpen>>", self._on_tree_open)
+        self.tree.bind("<<TreeviewClose>>", self._on_tree_close)
+        
+        # Double-click a row to edit it, press Delete to delete it, or select it and use the buttons below
+        self.tree.bind("<Double-1>", lambda e: self._category_row_action(self._show_edit_category_dialog,
+                                                                         self.tree.identify_row(e.y)))
+        self.tree.bind("<Delete>", lambda e: self._category_row_action(self._confirm_delete_category,
+                                                                       self.tree.focus()))
+        
+        edit_btn = ttk.Button(actions_frame, text="Edit", width=10,
+                            command=lambda: self._category_row_action(self._show_edit_category_dialog,
+                                                                      self.tree.focus()))
+        edit_btn.pack(side="left", padx=2)
         
-        # Budget info
-        budget_label = ttk.Label(top_frame, text=f"Budget: ${category.budget:.2f}")
-        budget_label.pack(side="left", padx=20)
+        delete_btn = ttk.Button(actions_frame, text="Delete", width=10,
+                              command=lambda: self._category_row_action(self._confirm_delete_category,
+                                                                        self.tree.focus()))
+        delete_btn.pack(side="left", padx=2)
         
-        # Actions
-        actions_frame = ttk.Frame(top_frame)
-        actions_frame.pack(side="right")
+        # Subcategories are added to the selected category, or to the parent of a selected subcategory
+        add_sub_btn = ttk.Button(actions_frame, text="Add Subcategory",
+                               command=lambda: self._category_row_action(
+                                   self._show_add_subcategory_dialog,
+                                   self.tree.parent(self.tree.focus()) or self.tree.focus()))
+        add_sub_btn.pack(side="left", padx=2)
         
-        edit_btn = ttk.Button(actions_frame, text="Edit", width=5,
-                            command=lambda c=category: self._show_edit_category_dialog(c))
-        edit_btn.pack(side="left", padx=2)
+        self.no_data_label = ttk.Label(table, text="No categories found", style="Empty.TLabel")
+    
+    def _show_categories_list(self):
+        """Show the filtered categories in the tree, each standalone category followed by its subcategories."""
+        items = self._filtered_items
+        
+        # Categories shown expanded, whether by the user or by the current search
+        expanded_ids = self._expanded | self._search_expanded
+        
+        # Leave the tree alone if it already shows exactly this
+        render_keys = [(category.category_id, category.name, category.budget, category.color,
+                        category.category_id in expanded_ids,
+                        tuple((sub.category_id, sub.name, sub.budget, sub.color) for sub in subcategories))
+                       for category, subcategories in items]
+        if render_keys == self._last_render_keys:
+            return
         
-        delete_btn = ttk.Button(actions_frame, text="Delete", width=5,
-                              command=lambda c=category: self._confirm_delete_category(c))
-        delete_btn.pack(side="left", padx=2)
+        self._last_render_keys = render_keys
+        
+        # Rows wanted in the tree, in display order, keyed by category id
+        rows = []
+        for category, subcategories in items:
+            category_id = category.category_id
+            expanded = category_id in expanded_ids
+            rows.append(("", category_id, {"text": category.name, "image": self._get_swatch(category.color),
+                                           "values": (category.budget_display,), "open": expanded}))
+            if expanded:
+                rows.extend((category_id, subcat.category_id,
+                             {"text": subcat.name, "image": self._get_swatch(subcat.color),
+                              "values": (subcat.budget_display,)})
+                            for subcat in subcategories)
+            elif subcategories:
+                # Placeholder row so the category can be expanded; replaced by the subcategories on open
+                rows.append((category_id, f"{category_id}:more", {"text": f"{len(subcategories)} subcategories"}))
+        
+        # Reconcile the tree with those rows: drop the ones that went away, then update or insert the rest
+        # in place, so unchanged rows (and the selection and scroll position) survive the refresh
+        tree = self.tree
+        wanted = {iid for _, iid, _ in rows}
+        stale = []
+        for top in tree.get_children():
+            if top not in wanted:
+                stale.append(top)
+            else:
+                stale.extend(iid for iid in tree.get_children(top) if iid not in wanted)
+        if stale:
+            tree.delete(*stale)
+        
+        positions = {}
+        for parent, iid, options in rows:
+            index = positions.get(parent, 0)
+            positions[parent] = index + 1
+            if tree.exists(iid):
+                tree.item(iid, **options)
+                tree.move(iid, parent, index)
+            else:
+                tree.insert(parent, index, iid=iid, **options)
+        
+        if items:
+            self.no_data_label.pack_forget()
+        else:
+            self.no_data_label.pack(pady=20, before=self.tree_frame)
+    
+    def _insert_subcategories(self, parent_id, subcategories):
+        """Insert the rows of a category's subcategories below it."""
+        for subcat in subcategories:
+            self.tree.insert(parent_id, "end", iid=subcat.category_id, text=subcat.name,
+                             image=self._get_swatch(subcat.color), values=(subcat.budget_display,))
+    
+    def _on_tree_open(self, event):
+        """Replace the placeholder of an expanded category with its subcategory rows."""
+        category_id = self.tree.focus()
+        self._expanded.add(category_id)
+        
+        placeholder = f"{category_id}:more"
+        if self.tree.exists(placeholder):
+            self.tree.delete(placeholder)
+            # Insert exactly the rows a full render would, so the render skip in _show_categories_list stays valid
+            subcategories = next((subcategories for category, subcategories in self._filtered_items
+                                  if category.category_id == category_id), ())
+            self._insert_subcategories(category_id, subcategories)
+    
+    def _on_tree_close(self, event):
+        """Remember that a category was collapsed."""
+        category_id = self.tree.focus()
+        self._expanded.discard(category_id)
+        self._search_expanded.discard(category_id)
+    
+    def _get_swatch(self, color):
+        """
+        Get a small image filled with a category color, creating it the first time the color is seen.
         
-        # Display subcategories if any
-        if subcategories:
-            # Add separator
-            ttk.Separator(card, orient="horizontal").pack(fill="x", pady=10)
-            
-            # Subcategories container
-            sub_frame = ttk.Frame(card)
-            sub_frame.pack(fill="x")
-            
-            # Configure grid
-            columns = 3  # Number of subcategories per row
-            for i in range(columns):
-                sub_frame.grid_columnconfigure(i, weight=1)
-            
-            # Add subcategories
-            for i, subcat in enumerate(subcategories):
-                # Calculate grid position
-                row = i // columns
-                col = i % columns
-                
-                # Create subcategory card
-                subcat_card = ttk.Frame(sub_frame, padding=5)
-                subcat_card.grid(row=row, column=col, padx=5, pady=5, sticky="ew")
-                
-                # Create color indicator
-                sub_color = tk.Frame(subcat_card, width=10, height=10, background=subcat.color)
-                sub_color.pack(side="left", padx=(0, 5))
-                
-                # Subcategory name
-                sub_name = ttk.Label(subcat_card, text=subcat.name)
-                sub_name.pack(side="left")
-                
-                # Actions for subcategory
-                sub_actions = ttk.Frame(subcat_card)
-                sub_actions.pack(side="right")
-                
-                sub_edit = ttk.Button(sub_actions, text="Edit", width=4,
-                                    command=lambda c=subcat: self._show_edit_category_dialog(c))
-                sub_edit.pack(side="left", padx=2)
-                
-                sub_delete = ttk.Button(sub_actions, text="Del", width=4,
-                                      command=lambda c=subcat: self._confirm_delete_category(c))
-                sub_delete.pack(side="left", padx=2)
+        Args:
+            color (str): The category color.
             
-            # Add new subcategory button
-            add_sub_btn = ttk.Button(card, text="Add Subcategory", 
-                                   command=lambda c=category: self._show_add_subcategory_dialog(c))
-            add_sub_btn.pack(anchor="e", pady=(10, 0))
-        else:
-            # No subcategories, show add button
-            add_sub_btn = ttk.Button(card, text="Add Subcategory", 
-                                   command=lambda c=category: self._show_add_subcategory_dialog(c))
-            add_sub_btn.pack(anchor="e", pady=(10, 0))
+        Returns:
+            tk.PhotoImage: The swatch, or an empty string if the color is not valid.
+        """
+        swatch = self._swatches.get(color)
+        if swatch is None:
+            swatch = tk.PhotoImage(width=_SWATCH_SIZE, height=_SWATCH_SIZE)
+            try:
+                swatch.put(color, to=(0, 0, _SWATCH_SIZE, _SWATCH_SIZE))
+            except tk.TclError:
+                swatch = ""
+            self._swatches[color] = swatch
+        return swatch
+    
+    def _category_row_action(self, action, category_id):
+        """
+        Run an action on the category of a tree row.
+        
+        Args:
+            action (callable): Method taking the category, e.g. _show_edit_category_dialog.
+            category_id (str): ID of the row's category; empty when no row was hit or selected.
+        """
+        category = self.category_dict.get(category_id) if category_id else None
+        if category:
+            action(category)
+    
+    def _get_category_dialog(self):
+        """Get the category dialog, building it the first time it is needed."""
+        if self._category_dialog is None or not self._category_dialog.window.winfo_exists():
+            self._category_dialog = _CategoryDialog(self)
+        return self._category_dialog
     
     def _show_add_category_dialog(self):
         """Show dialog for adding a new category."""
-        # Create a dialog window
-        dialog = tk.Toplevel(self)
-        dialog.title("Add New Category")
-        dialog.geometry("400x350")
-        dialog.resizable(False, False)
-        dialog.transient(self)  # Make dialog modal
-        dialog.grab_set()
-        
-        # Create form
-        frame = ttk.Frame(dialog, padding=20)
-        frame.pack(fill="both", expand=True)
+        dialog = self._get_category_dialog()
         
-        # Category name
-        ttk.Label(frame, text="Category Name:").grid(row=0, column=0, sticky="w", pady=5)
-        name_var = tk.StringVar()
-        name_entry = ttk.Entry(frame, textvariable=name_var, width=30)
-        name_entry.grid(row=0, column=1, sticky="ew", pady=5)
-        name_entry.focus_set()
-        
-        # Budget
-        ttk.Label(frame, text="Budget:").grid(row=1, column=0, sticky="w", pady=5)
-        budget_var = tk.StringVar(value="0.0")
-        budget_entry = ttk.Entry(frame, textvariable=budget_var, width=30)
-        budget_entry.grid(row=1, column=1, sticky="ew", pady=5)
-        
-        # Color
-        ttk.Label(frame, text="Color:").grid(row=2, column=0, sticky="w", pady=5)
-        
-        # Generate a random color
-        default_color = "#{:02x}{:02x}{:02x}".format(random.randint(0, 255), 
-                                                    random.randint(0, 255), 
-                                                    random.randint(0, 255))
-        color_var = tk.StringVar(value=default_color)
-        
-        color_preview = tk.Frame(frame, width=30, height=30, bg=default_color)
-        color_preview.grid(row=2, column=1, sticky="w", pady=5)
-        
-        color_btn = ttk.Button(frame, text="Select Color", 
-                             command=lambda: self._choose_color(color_var, color_preview))
-        color_btn.grid(row=2, column=1, sticky="e", pady=5)
+        # Generate a random color from a single 24-bit draw
+        default_color = f"#{random.getrandbits(24):06x}"
         
-        # Buttons
-        btn_frame = ttk.Frame(frame)
-        btn_frame.grid(row=4, column=0, columnspan=2, pady=20)
-        
-        save_btn = ttk.Button(btn_frame, text="Save", 
-                            command=lambda: self._save_category(dialog, name_var.get(), 
-                                                             budget_var.get(), color_var.get()))
-        save_btn.pack(side="left", padx=5)
-        
-        cancel_btn = ttk.Button(btn_frame, text="Cancel", command=dialog.destroy)
-        cancel_btn.pack(side="left", padx=5)
+        dialog.show("Add New Category", "Category Name:", "", "0.0", default_color,
+                    lambda: self._save_category(dialog, dialog.name_var.get(), 
+                                                dialog.budget_var.get(), dialog.color_var.get()))
     
     def _show_add_subcategory_dialog(self, parent_category):
         """Show dialog for adding a subcategory."""
-        # Create a dialog window
-        dialog = tk.Toplevel(self)
-        dialog.title(f"Add Subcategory to {parent_category.name}")
-        dialog.geometry("400x350")
-        dialog.resizable(False, False)
-        dialog.transient(self)  # Make dialog modal
-        dialog.grab_set()
-        
-        # Create form
-        frame = ttk.Frame(dialog, padding=20)
-        frame.pack(fill="both", expand=True)
-        
-        # Category name
-        ttk.Label(frame, text="Subcategory Name:").grid(row=0, column=0, sticky="w", pady=5)
-        name_var = tk.StringVar()
-        name_entry = ttk.Entry(frame, textvariable=name_var, width=30)
-        name_entry.grid(row=0, column=1, sticky="ew", pady=5)
-        name_entry.focus_set()
-        
-        # Budget
-        ttk.Label(frame, text="Budget:").grid(row=1, column=0, sticky="w", pady=5)
-        budget_var = tk.StringVar(value="0.0")
-        budget_entry = ttk.Entry(frame, textvariable=budget_var, width=30)
-        budget_entry.grid(row=1, column=1, sticky="ew", pady=5)
-        
-        # Color
-        ttk.Label(frame, text="Color:").grid(row=2, column=0, sticky="w", pady=5)
+        dialog = self._get_category_dialog()
         
         # Generate a random color similar to parent
-        parent_color = parent_category.color.lstrip('#')
-        parent_rgb = tuple(int(parent_color[i:i+2], 16) for i in (0, 2, 4))
-        
-        # Slightly vary the color
-        new_rgb = tuple(max(0, min(255, c + random.randint(-40, 40))) for c in parent_rgb)
-        default_color = "#{:02x}{:02x}{:02x}".format(*new_rgb)
-        
-        color_var = tk.StringVar(value=default_color)
-        
-        color_preview = tk.Frame(frame, width=30, height=30, bg=default_color)
-        color_preview.grid(row=2, column=1, sticky="w", pady=5)
-        
-        color_btn = ttk.Button(frame, text="Select Color", 
-                             command=lambda: self._choose_color(color_var, color_preview))
-        color_btn.grid(row=2, column=1, sticky="e", pady=5)
+        parent_rgb = _hex_to_rgb(parent_category.color)
         
-        # Buttons
-        btn_frame = ttk.Frame(frame)
-        btn_frame.grid(row=4, column=0, columnspan=2, pady=20)
+        # Slightly vary the color, taking a -40..40 offset per channel from one byte of a single random draw
+        bits = random.getrandbits(24)
+        default_color = "#" + "".join(_HEX[max(0, min(255, c + (bits >> shift & 0xff) % 81 - 40))]
+                                      for c, shift in zip(parent_rgb, (16, 8, 0)))
         
-        save_btn = ttk.Button(btn_frame, text="Save", 
-                            command=lambda: self._save_subcategory(dialog, name_var.get(), 
-                                                                parent_category.category_id,
-                                                                budget_var.get(), color_var.get()))
-        save_btn.pack(side="left", padx=5)
-        
-        cancel_btn = ttk.Button(btn_frame, text="Cancel", command=dialog.destroy)
-        cancel_btn.pack(side="left", padx=5)
+        dialog.show(f"Add Subcategory to {parent_category.name}", "Subcategory Name:", "", "0.0", default_color,
+                    lambda: self._save_subcategory(dialog, dialog.name_var.get(), 
+                                                   parent_category.category_id,
+                                                   dialog.budget_var.get(), dialog.color_var.get()))
     
     def _show_edit_category_dialog(self, category):
         """Show dialog for editing a category."""
-        # Create a dialog window
-        dialog = tk.Toplevel(self)
-        dialog.title(f"Edit Category: {category.name}")
-        dialog.geometry("400x350")
-        dialog.resizable(False, False)
-        dialog.transient(self)  # Make dialog modal
-        dialog.grab_set()
-        
-        # Create form
-        frame = ttk.Frame(dialog, padding=20)
-        frame.pack(fill="both", expand=True)
-        
-        # Category name
-        ttk.Label(frame, text="Category Name:").grid(row=0, column=0, sticky="w", pady=5)
-        name_var = tk.StringVar(value=category.name)
-        name_entry = ttk.Entry(frame, textvariable=name_var, width=30)
-        name_entry.grid(row=0, column=1, sticky="ew", pady=5)
-        name_entry.focus_set()
-        
-        # Budget
-        ttk.Label(frame, text="Budget:").grid(row=1, column=0, sticky="w", pady=5)
-        budget_var = tk.StringVar(value=str(category.budget))
-        budget_entry = ttk.Entry(frame, textvariable=budget_var, width=30)
-        budget_entry.grid(row=1, column=1, sticky="ew", pady=5)
-        
-        # Color
-        ttk.Label(frame, text="Color:").grid(row=2, column=0, sticky="w", pady=5)
-        color_var = tk.StringVar(value=category.color)
-        
-        color_preview = tk.Frame(frame, width=30, height=30, bg=category.color)
-        color_preview.grid(row=2, column=1, sticky="w", pady=5)
-        
-        color_btn = ttk.Button(frame, text="Select Color", 
-                             command=lambda: self._choose_color(color_var, color_preview))
-        color_btn.grid(row=2, column=1, sticky="e", pady=5)
-        
-        # Buttons
-        btn_frame = ttk.Frame(frame)
-        btn_frame.grid(row=4, column=0, columnspan=2, pady=20)
-        
-        save_btn = ttk.Button(btn_frame, text="Save", 
-                            command=lambda: self._update_category(dialog, category, 
-                                                               name_var.get(), 
-                                                               budget_var.get(), 
-                                                               color_var.get()))
-        save_btn.pack(side="left", padx=5)
-        
-        cancel_btn = ttk.Button(btn_frame, text="Cancel", command=dialog.destroy)
-        cancel_btn.pack(side="left", padx=5)
+        dialog = self._get_category_dialog()
+        dialog.show(f"Edit Category: {category.name}", "Category Name:", category.name, str(category.budget),
+                    category.color,
+                    lambda: self._update_category(dialog, category, 
+                                                  dialog.name_var.get(), 
+                                                  dialog.budget_var.get(), 
+                                                  dialog.color_var.get()))
     
     def _choose_color(self, color_var, preview_widget):
         """Show color picker dialog and update the color variable and preview."""
@@ -470,18 +548,19 @@ class CategoriesFrame(BaseFrame):
             self.show_message("Error", "Category name cannot be empty", "error")
             return
         
-        try:
-            budget_value = float(budget)
-        except ValueError:
+        if not _BUDGET_RE.fullmatch(budget):
             self.show_message("Error", "Budget must be a number", "error")
             return
+        budget_value = float(budget)
         
         # Create and save the category
-        user_id = self.controller.current_user.user_id if self.controller.current_user else None
+        user = self.controller.current_user
+        user_id = user.user_id if user else None
         category = Category(name=name, budget=budget_value, color=color, user_id=user_id)
         
         if category.save(self.controller.data_dir):
-            dialog.destroy()
+            self.controller.mark_data_changed()
+            dialog.hide()
             self.refresh_data()
             self.show_message("Success", "Category added successfully", "info")
         else:
@@ -493,19 +572,20 @@ class CategoriesFrame(BaseFrame):
             self.show_message("Error", "Subcategory name cannot be empty", "error")
             return
         
-        try:
-            budget_value = float(budget)
-        except ValueError:
+        if not _BUDGET_RE.fullmatch(budget):
             self.show_message("Error", "Budget must be a number", "error")
             return
+        budget_value = float(budget)
         
         # Create and save the subcategory
-        user_id = self.controller.current_user.user_id if self.controller.current_user else None
+        user = self.controller.current_user
+        user_id = user.user_id if user else None
         category = Category(name=name, parent_id=parent_id, budget=budget_value, 
                           color=color, user_id=user_id)
         
         if category.save(self.controller.data_dir):
-            dialog.destroy()
+            self.controller.mark_data_changed()
+            dialog.hide()
             self.refresh_data()
             self.show_message("Success", "Subcategory added successfully", "info")
         else:
@@ -517,11 +597,10 @@ class CategoriesFrame(BaseFrame):
             self.show_message("Error", "Category name cannot be empty", "error")
             return
         
-        try:
-            budget_value = float(budget)
-        except ValueError:
+        if not _BUDGET_RE.fullmatch(budget):
             self.show_message("Error", "Budget must be a number", "error")
             return
+        budget_value = float(budget)
         
         # Update category attributes
         category.name = name
@@ -529,7 +608,8 @@ class CategoriesFrame(BaseFrame):
         category.color = color
         
         if category.save(self.controller.data_dir):
-            dialog.destroy()
+            self.controller.mark_data_changed()
+            dialog.hide()
             self.refresh_data()
             self.show_message("Success", "Category updated successfully", "info")
         else:
@@ -538,7 +618,7 @@ class CategoriesFrame(BaseFrame):
     def _confirm_delete_category(self, category):
         """Confirm and delete a category."""
         # Check if the category has subcategories
-        subcategories = [cat for cat in self.categories if cat.parent_id == category.category_id]
+        subcategories = self._get_sorted_index()[1].get(category.category_id, ())
         
         if subcategories:
             message = f"This category has {len(subcategories)} subcategories that will also be deleted. Are you sure you want to delete '{category.name}' and all its subcategories?"
@@ -547,14 +627,11 @@ class CategoriesFrame(BaseFrame):
         
         if self.ask_yes_no("Confirm Delete", message):
             try:
-                # Delete the category
-                success = category.delete(self.controller.data_dir)
-                
-                # Delete subcategories if they exist
-                for subcat in subcategories:
-                    subcat.delete(self.controller.data_dir)
+                # Delete the category and its subcategories with one write per store
+                success = Category.delete_many([category, *subcategories], self.controller.data_dir)
                 
                 if success:
+                    self.controller.mark_data_changed()
                     self.refresh_data()
                     self.show_message("Success", "Category deleted successfully", "info")
                 else:
@@ -562,41 +639,151 @@ class CategoriesFrame(BaseFrame):
             except Exception as e:
                 self.show_message("Error", f"Error deleting category: {str(e)}", "error")
     
+    def _schedule_search(self):
+        """Apply the filters once a burst of keystrokes in the search box has settled."""
+        self._cancel_pending_search()
+        self._search_after_id = self.after(150, self._do_search)
+    
+    def _do_search(self):
+        """Run the debounced search."""
+        self._search_after_id = None
+        if self.winfo_exists():
+            self._apply_filters()
+    
+    def _cancel_pending_search(self):
+        """Cancel a debounced search that has not run yet."""
+        if self._search_after_id is not None:
+            self.after_cancel(self._search_after_id)
+            self._search_after_id = None
+    
     def _apply_filters(self):
         """Apply filters to the category list."""
-        # Stub implementation - will be expanded later
+        # Applying the filters now supersedes any pending debounced search
+        self._cancel_pending_search()
+        
+        # Compile the search once: every word of the query must appear in the lowercased name
+        terms = self.search_var.get().lower().split()
+        query = re.compile("".join(f"(?=.*{re.escape(term)})" for term in terms)).match if terms else None
+        main_only = self.view_var.get() == "main"
+        name_keys = self._name_keys
+        standalone, children_by_parent = self._get_sorted_index()
+        
+        items = []
+        search_expanded = set()
+        for category in standalone:
+            subcategories = () if main_only else children_by_parent.get(category.category_id, ())
+            
+            # A category that doesn't match the search stays listed with just its matching subcategories
+            if query and not query(name_keys[category.category_id]):
+                subcategories = [sub for sub in subcategories if query(name_keys[sub.category_id])]
+                if not subcategories:
+                    continue
+                search_expanded.add(category.category_id)
+            
+            items.append((category, subcategories))
+        
+        # Expansions made for a search last only while that search is active
+        self._search_expanded = search_expanded
+        self._filtered_items = items
         self._show_categories_list()
     
+    def _get_sorted_index(self):
+        """Return the standalone categories and the subcategories by parent, sorted by the current sort option."""
+        sort_by = self.sort_var.get()
+        index = self._sorted_index.get(sort_by)
+        if index is None:
+            if sort_by == "budget":
+                sort_key = lambda cat: -cat.budget
+            else:
+                name_keys = self._name_keys
+                sort_key = lambda cat: name_keys[cat.category_id]
+            
+            index = self._sorted_index[sort_by] = (
+                sorted(self._standalone, key=sort_key),
+                {parent_id: sorted(subcategories, key=sort_key)
+                 for parent_id, subcategories in self._children_by_parent.items()})
+        return index
+    
+    def _reload_categories(self):
+        """Re-read the categories from disk on a worker thread so the window stays responsive."""
+        user = self.controller.current_user
+        if not user:
+            self.refresh_data()
+            return
+        
+        # A reload is already running; its result will be shown
+        if self._loading_user_id is not None:
+            return
+        
+        self._loading_user_id = user_id = user.user_id
+        data_dir = self.controller.data_dir
+        self.loading_label.pack(side="right", padx=10)
+        
+        threading.Thread(target=self._load_categories_bg, args=(user_id, data_dir), daemon=True).start()
+        self.after(50, self._drain_load_queue)
+    
+    def _load_categories_bg(self, user_id, data_dir):
+        """Read the categories of a user; runs on the worker thread and must not touch Tk."""
+        try:
+            self._load_queue.put(Category.get_all_categories(user_id, data_dir))
+        except Exception as e:
+            print(f"Error loading categories: {e}")
+            self._load_queue.put(None)
+    
+    def _drain_load_queue(self):
+        """Pick up the categories read by the worker thread, polling until they arrive."""
+        try:
+            categories = self._load_queue.get_nowait()
+        except queue.Empty:
+            self.after(50, self._drain_load_queue)
+            return
+        
+        user_id, self._loading_user_id = self._loading_user_id, None
+        if not self.winfo_exists():
+            return
+        self.loading_label.pack_forget()
+        
+        # Ignore the result if the read failed or another user logged in meanwhile
+        current_user = self.controller.current_user
+        if categories is not None and current_user and current_user.user_id == user_id:
+            self.controller.mark_data_changed(categories)
+        self.refresh_data()
+    
     def refresh_data(self):
         """Refresh the category data and view."""
-        if self.controller.current_user:
-            user_id = self.controller.current_user.user_id
-            self.categories = Category.get_all_categories(user_id, self.controller.data_dir)
-            self.category_dict = {cat.category_id: cat for cat in self.categories}
+        controller = self.controller
+        if controller.current_user:
+            self.categories = controller.categories
+            self.category_dict = controller.categories_by_id
             
-            # Create parent categories dict
-            self.parent_categories = {}
-            for category in self.categories:
-                if not category.parent_id:
-                    self.parent_categories[category.category_id] = category
+            # The controller indexes the categories by parent once per data change
+            self._standalone = controller.top_level_categories
+            self._children_by_parent = controller.subcategories_by_parent
+            self._name_keys = {category.category_id: category.name.lower() for category in self.categories}
+            self._sorted_index = {}
             
             # Apply current filters
             self._apply_filters()
         else:
             self.categories = []
             self.category_dict = {}
-            self.parent_categories = {}
+            self._children_by_parent = {}
+            self._standalone = []
+            self._name_keys = {}
+            self._sorted_index = {}
             
             # Update UI
-            self._show_categories_list()
+            self._apply_filters()
     
     def on_show_frame(self):
         """Called when the frame is shown."""
         # Update user info
-        if self.controller.current_user:
-            self.user_var.set(f"Welcome, {self.controller.current_user.username}")
+        user = self.controller.current_user
+        if user:
+            self.user_var.set(f"Welcome, {user.username}")
         else:
             self.user_var.set("Welcome, User")
         
-        # Refresh categories data
-        self.refresh_data()
+        # Refresh categories data if it changed since the last time the frame was shown
+        if self.needs_refresh():
+            self.refresh_data()
@@ -10,7 +10,6 @@ import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from .base import BaseFrame, ScrollableFrame, Tooltip
 from models.expense import Expense
-from models.category import Category
 from utils.analysis import get_monthly_summary, compare_time_periods, detect_spending_anomalies, export_expenses_to_csv
 from utils.visualization import create_expense_pie_chart, create_monthly_trend_chart, figure_to_image
 
@@ -158,8 +157,7 @@ class DashboardFrame(BaseFrame):
         if self.controller.current_user:
             user_id = self.controller.current_user.user_id
             self.expenses = Expense.get_user_expenses(user_id, self.controller.data_dir)
-            categories = Category.get_all_categories(user_id, self.controller.data_dir)
-            self.categories_dict = {cat.category_id: cat for cat in categories}
+            self.categories_dict = self.controller.categories_by_id
             
             # Get monthly summary
             summary = get_monthly_summary(self.expenses, self.categories_dict)
@@ -390,6 +388,7 @@ class DashboardFrame(BaseFrame):
         """Handle clicking the logout button."""
         if self.ask_yes_no("Confirm Logout", "Are you sure you want to log out?"):
             self.controller.current_user = None
+            self.controller.refresh_categories()
             self.controller.show_frame("LoginFrame")
     
     def _quick_add_expense(self):
@@ -403,8 +402,7 @@ class DashboardFrame(BaseFrame):
         if self.controller.current_user:
             user_id = self.controller.current_user.user_id
             self.expenses = Expense.get_user_expenses(user_id, self.controller.data_dir)
-            categories = Category.get_all_categories(user_id, self.controller.data_dir)
-            self.categories_dict = {cat.category_id: cat for cat in categories}
+            self.categories_dict = self.controller.categories_by_id
         
         self._show_overview_panel()
     
@@ -418,8 +416,7 @@ class DashboardFrame(BaseFrame):
         # Get user's expenses
         user_id = self.controller.current_user.user_id
         expenses = Expense.get_user_expenses(user_id, self.controller.data_dir)
-        categories = Category.get_all_categories(user_id, self.controller.data_dir)
-        categories_dict = {cat.category_id: cat for cat in categories}
+        categories_dict = self.controller.categories_by_id
         
         if not expenses:
             self.show_message("No Data", "There are no expenses to export.", "info")
@@ -456,5 +453,6 @@ class DashboardFrame(BaseFrame):
         else:
             self.user_var.set("Welcome, User")
         
-        # Refresh dashboard
-        self._refresh_dashboard()
+        # Refresh dashboard if the data changed since the last time it was shown
+        if self.needs_refresh():
+            self._refresh_dashboard()
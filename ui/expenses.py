@@ -6,15 +6,66 @@ import tkinter as tk
 from tkinter import ttk
 from datetime import datetime
 import calendar
-import os
 import csv
 from tkinter import filedialog
+from functools import partial
 from tkcalendar import DateEntry
 from .base import BaseFrame, ScrollableFrame, Tooltip
 from models.expense import Expense
-from models.category import Category
 from utils.analysis import export_expenses_to_csv
 
+
+class _ExpenseRow:
+    """The widgets of one row of the expenses table, reused for whichever expense it currently shows."""
+    
+    __slots__ = ("expense", "frame", "date", "description", "category", "amount")
+    
+    def __init__(self, owner, parent, index):
+        """
+        Create the row widgets and place the row in the table grid.
+        
+        Args:
+            owner (ExpensesFrame): The frame whose dialogs the row's buttons open.
+            parent: The rows container of the expenses table.
+            index (int): Grid row of the row.
+        """
+        # Expense currently shown, read by the buttons when clicked
+        self.expense = None
+        
+        self.frame = ttk.Frame(parent)
+        self.frame.grid(row=index, column=0, columnspan=5, sticky="ew", pady=2)
+        
+        # Configure row columns
+        self.frame.grid_columnconfigure(0, weight=1)
+        self.frame.grid_columnconfigure(1, weight=2)
+        self.frame.grid_columnconfigure(2, weight=1)
+        self.frame.grid_columnconfigure(3, weight=1)
+        self.frame.grid_columnconfigure(4, weight=0)
+        
+        self.date = ttk.Label(self.frame)
+        self.date.grid(row=0, column=0, sticky="w", padx=5)
+        
+        self.description = ttk.Label(self.frame)
+        self.description.grid(row=0, column=1, sticky="w", padx=5)
+        
+        self.category = ttk.Label(self.frame)
+        self.category.grid(row=0, column=2, sticky="w", padx=5)
+        
+        self.amount = ttk.Label(self.frame)
+        self.amount.grid(row=0, column=3, sticky="w", padx=5)
+        
+        # Actions
+        actions_frame = ttk.Frame(self.frame)
+        actions_frame.grid(row=0, column=4, sticky="e", padx=5)
+        
+        edit_btn = ttk.Button(actions_frame, text="Edit", width=5,
+                            command=partial(owner._expense_row_action, owner._show_edit_expense_dialog, self))
+        edit_btn.pack(side="left", padx=2)
+        
+        delete_btn = ttk.Button(actions_frame, text="Delete", width=5,
+                              command=partial(owner._expense_row_action, owner._confirm_delete_expense, self))
+        delete_btn.pack(side="left", padx=2)
+
 class ExpensesFrame(BaseFrame):
     """Main frame for managing expenses."""
     
@@ -66,7 +117,8 @@ class ExpensesFrame(BaseFrame):
         self.main_panel.grid_rowconfigure(0, weight=1)
         self.main_panel.grid_columnconfigure(0, weight=1)
         
-        # Show expenses list by default
+        # Build the expenses list once and show it by default
+        self._build_layout()
         self._show_expenses_list()
     
     def _create_navbar(self, parent):
@@ -101,7 +153,7 @@ class ExpensesFrame(BaseFrame):
         sidebar.grid(row=0, column=0, sticky="ns")
         
         # Filter section
-        filter_label = ttk.Label(sidebar, text="Filter Expenses", font=("Helvetica", 12, "bold"))
+        filter_label = ttk.Label(sidebar, text="Filter Expenses", style="BoldMed.TLabel")
         filter_label.pack(anchor="w", pady=(0, 10))
         
         # Date filters
@@ -180,7 +232,7 @@ class ExpensesFrame(BaseFrame):
         ttk.Separator(sidebar, orient="horizontal").pack(fill="x", pady=10)
         
         # Export section
-        export_label = ttk.Label(sidebar, text="Export Data", font=("Helvetica", 12, "bold"))
+        export_label = ttk.Label(sidebar, text="Export Data", style="BoldMed.TLabel")
         export_label.pack(anchor="w", pady=(10, 5))
         
         # Export button - Tamamen yeniden oluşturuyoruz
@@ -194,12 +246,8 @@ class ExpensesFrame(BaseFrame):
                            command=self.show_add_expense_dialog)
         add_btn.pack(pady=10, fill="x")
     
-    def _show_expenses_list(self):
-        """Show the expenses list in the main panel."""
-        # Clear the main panel
-        for widget in self.main_panel.winfo_children():
-            widget.destroy()
-        
+    def _build_layout(self):
+        """Build the parts of the expenses list that don't depend on the data, once."""
         # Create scrollable container
         scrollable = ScrollableFrame(self.main_panel)
         scrollable.pack(side="top", fill="both", expand=True)
@@ -217,7 +265,7 @@ class ExpensesFrame(BaseFrame):
         search_frame.pack(side="right")
         
         self.search_var = tk.StringVar()
-        self.search_var.trace("w", lambda name, index, mode: self._apply_filters())
+        self.search_var.trace_add("write", lambda name, index, mode: self._apply_filters())
         
         search_entry = ttk.Entry(search_frame, textvariable=self.search_var, width=20)
         search_entry.pack(side="left", padx=5)
@@ -226,7 +274,7 @@ class ExpensesFrame(BaseFrame):
         search_btn.pack(side="left")
         
         # Create expenses table
-        table_frame = ttk.Frame(container, style="Card.TFrame", padding=10)
+        self.table_frame = table_frame = ttk.Frame(container, style="Card.TFrame", padding=10)
         table_frame.pack(pady=10, fill="both", expand=True, padx=20)
         
         # Table headers
@@ -241,15 +289,15 @@ class ExpensesFrame(BaseFrame):
         headers_frame.grid_columnconfigure(4, weight=0)  # Actions
         
         # Add headers
-        ttk.Label(headers_frame, text="Date", font=("Helvetica", 10, "bold")).grid(row=0, column=0, sticky="w", padx=5)
-        ttk.Label(headers_frame, text="Description", font=("Helvetica", 10, "bold")).grid(row=0, column=1, sticky="w", padx=5)
-        ttk.Label(headers_frame, text="Category", font=("Helvetica", 10, "bold")).grid(row=0, column=2, sticky="w", padx=5)
-        ttk.Label(headers_frame, text="Amount", font=("Helvetica", 10, "bold")).grid(row=0, column=3, sticky="w", padx=5)
-        ttk.Label(headers_frame, text="Actions", font=("Helvetica", 10, "bold")).grid(row=0, column=4, sticky="w", padx=5)
+        ttk.Label(headers_frame, text="Date", style="BoldSmall.TLabel").grid(row=0, column=0, sticky="w", padx=5)
+        ttk.Label(headers_frame, text="Description", style="BoldSmall.TLabel").grid(row=0, column=1, sticky="w", padx=5)
+        ttk.Label(headers_frame, text="Category", style="BoldSmall.TLabel").grid(row=0, column=2, sticky="w", padx=5)
+        ttk.Label(headers_frame, text="Amount", style="BoldSmall.TLabel").grid(row=0, column=3, sticky="w", padx=5)
+        ttk.Label(headers_frame, text="Actions", style="BoldSmall.TLabel").grid(row=0, column=4, sticky="w", padx=5)
         
         ttk.Separator(table_frame, orient="horizontal").pack(fill="x", pady=5)
         
-        # Expenses container
+        # Expenses container; its rows are created as needed by _show_expenses_list and then reused
         expenses_container = ttk.Frame(table_frame)
         expenses_container.pack(fill="both", expand=True)
         
@@ -260,74 +308,83 @@ class ExpensesFrame(BaseFrame):
         expenses_container.grid_columnconfigure(3, weight=1)  # Amount
         expenses_container.grid_columnconfigure(4, weight=0)  # Actions
         
-        # Add expenses rows
-        if self.filtered_expenses:
-            for i, expense in enumerate(self.filtered_expenses):
-                row_frame = ttk.Frame(expenses_container)
-                row_frame.grid(row=i, column=0, columnspan=5, sticky="ew", pady=2)
-                
-                # Configure row columns
-                row_frame.grid_columnconfigure(0, weight=1)
-                row_frame.grid_columnconfigure(1, weight=2)
-                row_frame.grid_columnconfigure(2, weight=1)
-                row_frame.grid_columnconfigure(3, weight=1)
-                row_frame.grid_columnconfigure(4, weight=0)
-                
-                # Date
-                ttk.Label(row_frame, text=expense.date).grid(row=0, column=0, sticky="w", padx=5)
-                
-                # Description
-                desc_text = expense.description
-                if len(desc_text) > 30:
-                    desc_text = desc_text[:27] + "..."
-                ttk.Label(row_frame, text=desc_text).grid(row=0, column=1, sticky="w", padx=5)
-                
-                # Category
-                category_name = "Unknown"
-                if expense.category_id in self.categories_dict:
-                    category_name = self.categories_dict[expense.category_id].name
-                ttk.Label(row_frame, text=category_name).grid(row=0, column=2, sticky="w", padx=5)
-                
-                # Amount
-                amount_text = f"${expense.amount:.2f}"
-                amount_color = "#2ecc71" if expense.is_income else "#e74c3c"
-                amount_label = ttk.Label(row_frame, text=amount_text, foreground=amount_color)
-                amount_label.grid(row=0, column=3, sticky="w", padx=5)
-                
-                # Actions
-                actions_frame = ttk.Frame(row_frame)
-                actions_frame.grid(row=0, column=4, sticky="e", padx=5)
-                
-                edit_btn = ttk.Button(actions_frame, text="Edit", width=5,
-                                    command=lambda e=expense: self._show_edit_expense_dialog(e))
-                edit_btn.pack(side="left", padx=2)
-                
-                delete_btn = ttk.Button(actions_frame, text="Delete", width=5,
-                                      command=lambda e=expense: self._confirm_delete_expense(e))
-                delete_btn.pack(side="left", padx=2)
-                
-                # Add separator
-                if i < len(self.filtered_expenses) - 1:
-                    ttk.Separator(expenses_container, orient="horizontal").grid(
-                        row=i+1, column=0, columnspan=5, sticky="ew", pady=5)
-        else:
-            no_data_label = ttk.Label(expenses_container, text="No expenses found matching your filters",
-                                    font=("Helvetica", 12))
-            no_data_label.pack(pady=20)
+        self.expenses_container = expenses_container
+        self._rows = []
+        self._rows_shown = 0
+        
+        self.no_data_label = ttk.Label(table_frame, text="No expenses found matching your filters",
+                                     style="Empty.TLabel")
         
         # Pagination (simplified)
         pagination_frame = ttk.Frame(container)
         pagination_frame.pack(pady=10, fill="x", padx=20)
         
         # Just show count for now
-        count_label = ttk.Label(pagination_frame, 
-                              text=f"Showing {len(self.filtered_expenses)} of {len(self.expenses)} expenses")
+        self.count_var = tk.StringVar()
+        count_label = ttk.Label(pagination_frame, textvariable=self.count_var)
         count_label.pack(side="left")
         
         # Add refresh button
         refresh_btn = ttk.Button(pagination_frame, text="Refresh", width=10,
                                command=self.refresh_data)
         refresh_btn.pack(side="right")
+    
+    def _show_expenses_list(self):
+        """Show the filtered expenses as rows of the expenses table, refilling the rows of the last render."""
+        count = len(self.filtered_expenses)
+        
+        # Add expenses rows, creating only the rows the pool doesn't have yet
+        for i, expense in enumerate(self.filtered_expenses):
+            if i == len(self._rows):
+                self._rows.append(_ExpenseRow(self, self.expenses_container, i))
+            row = self._rows[i]
+            row.expense = expense
+            
+            # Date
+            row.date.configure(text=expense.date)
+            
+            # Description
+            desc_text = expense.description
+            if len(desc_text) > 30:
+                desc_text = desc_text[:27] + "..."
+            row.description.configure(text=desc_text)
+            
+            # Category
+            category_name = "Unknown"
+            if expense.category_id in self.categories_dict:
+                category_name = self.categories_dict[expense.category_id].name
+            row.category.configure(text=category_name)
+            
+            # Amount
+            row.amount.configure(text=f"${expense.amount:.2f}",
+                                 foreground="#2ecc71" if expense.is_income else "#e74c3c")
+            
+            if i >= self._rows_shown:
+                row.frame.grid()
+        
+        # Hide the rows left over from a longer list without destroying them
+        for row in self._rows[count:self._rows_shown]:
+            row.expense = None
+            row.frame.grid_remove()
+        self._rows_shown = count
+        
+        if count:
+            self.no_data_label.pack_forget()
+        else:
+            self.no_data_label.pack(pady=20)
+        
+        self.count_var.set(f"Showing {count} of {len(self.expenses)} expenses")
+    
+    def _expense_row_action(self, action, row):
+        """
+        Run a row button's action on the expense the row currently shows.
+        
+        Args:
+            action (callable): Method taking the expense, e.g. _show_edit_expense_dialog.
+            row (_ExpenseRow): The row whose button was clicked.
+        """
+        if row.expense is not None:
+            action(row.expense)
 
     def _apply_filters(self):
         """Apply filters to the expense list."""
@@ -342,75 +399,66 @@ class ExpensesFrame(BaseFrame):
         type_filter = self.type_var.get()
         search_text = self.search_var.get().lower()
         
-        # Start with all expenses
-        filtered = self.expenses
-        
-        # Apply date filter
+        # Resolve each filter once up front, then test every expense in a single pass
         now = datetime.now()
+        date_prefix = None
+        date_range = None
         
         if date_filter == "current_month":
             # Current month
-            current_month = now.strftime("%Y-%m")
-            filtered = [e for e in filtered if e.date and e.date.startswith(current_month)]
+            date_prefix = now.strftime("%Y-%m")
         
         elif date_filter == "last_month":
             # Last month
             if now.month == 1:
-                last_month = f"{now.year-1}-12"
+                date_prefix = f"{now.year-1}-12"
             else:
-                last_month = f"{now.year}-{now.month-1:02d}"
-            
-            filtered = [e for e in filtered if e.date and e.date.startswith(last_month)]
+                date_prefix = f"{now.year}-{now.month-1:02d}"
         
         elif date_filter == "custom":
             # Custom date range
-            start = self.start_date.get_date().strftime("%Y-%m-%d")
-            end = self.end_date.get_date().strftime("%Y-%m-%d")
-            
-            # Make sure date is not None and is in proper format before comparing
-            filtered = [e for e in filtered if e.date and start <= e.date <= end]
+            date_range = (self.start_date.get_date().strftime("%Y-%m-%d"),
+                          self.end_date.get_date().strftime("%Y-%m-%d"))
         
-        # Apply category filter
+        # A main category also matches all of its subcategories
+        category_ids = None
         if category_filter != "all":
-            # Check if category is a main category (might have subcategories)
-            is_main = category_filter in self.categories_dict
-            
-            if is_main:
-                selected_category = self.categories_dict[category_filter]
-                
-                # If it's a main category, include all expenses with this category or its subcategories
-                if selected_category.parent_id is None:  # It's definitely a main category
-                    # Get all subcategory IDs for this main category
-                    subcategory_ids = [
-                        cat_id for cat_id, cat in self.categories_dict.items()
-                        if cat.parent_id == category_filter
-                    ]
-                    
-                    # Include the main category and all its subcategories
-                    filtered = [
-                        e for e in filtered 
-                        if e.category_id == category_filter or e.category_id in subcategory_ids
-                    ]
-                else:
-                    # It's a subcategory, just match directly
-                    filtered = [e for e in filtered if e.category_id == category_filter]
-            else:
-                # If it's not found (which shouldn't happen), just do a direct match
-                filtered = [e for e in filtered if e.category_id == category_filter]
-        
-        # Apply type filter
+            category_ids = {category_filter}
+            selected_category = self.categories_dict.get(category_filter)
+            if selected_category is not None and selected_category.parent_id is None:
+                category_ids.update(cat.category_id for cat in
+                                    self.controller.subcategories_by_parent.get(category_filter, ()))
+        
+        # Type filter: None keeps both expenses and income
+        income_filter = None
         if type_filter == "expense":
-            filtered = [e for e in filtered if not e.is_income]
+            income_filter = False
         elif type_filter == "income":
-            filtered = [e for e in filtered if e.is_income]
+            income_filter = True
         
-        # Apply search text
+        # Categories whose name matches the search text
+        search_category_ids = set()
         if search_text:
-            filtered = [e for e in filtered if (
-                search_text in e.description.lower() or
-                search_text in (self.categories_dict.get(e.category_id).name.lower() 
-                               if e.category_id in self.categories_dict else "")
-            )]
+            search_category_ids = {
+                cat_id for cat_id, cat in self.categories_dict.items()
+                if search_text in cat.name.lower()
+            }
+        
+        filtered = []
+        for e in self.expenses:
+            # Make sure date is not None before comparing
+            if date_prefix is not None and not (e.date and e.date.startswith(date_prefix)):
+                continue
+            if date_range is not None and not (e.date and date_range[0] <= e.date <= date_range[1]):
+                continue
+            if category_ids is not None and e.category_id not in category_ids:
+                continue
+            if income_filter is not None and bool(e.is_income) != income_filter:
+                continue
+            if search_text and not (search_text in e.description.lower() or
+                                    e.category_id in search_category_ids):
+                continue
+            filtered.append(e)
         
         # Update filtered expenses and refresh UI
         self.filtered_expenses = filtered
@@ -676,6 +724,7 @@ class ExpensesFrame(BaseFrame):
         
         # Save expense
         if expense.save(self.controller.data_dir):
+            self.controller.mark_data_changed()
             dialog.destroy()
             self.refresh_data()
         else:
@@ -907,6 +956,7 @@ class ExpensesFrame(BaseFrame):
         
         # Save expense
         if expense.save(self.controller.data_dir):
+            self.controller.mark_data_changed()
             dialog.destroy()
             self.refresh_data()
         else:
@@ -916,32 +966,19 @@ class ExpensesFrame(BaseFrame):
         """Confirm and delete an expense."""
         if self.ask_yes_no("Confirm Delete", 
                           f"Are you sure you want to delete this {('income' if expense.is_income else 'expense')}?"):
-            # Get the file path
-            user_id = self.controller.current_user.user_id
-            expense_file = os.path.join(self.controller.data_dir, "expenses", user_id, f"{expense.expense_id}.json")
-            
-            try:
-                if os.path.exists(expense_file):
-                    os.remove(expense_file)
-                
+            if expense.delete(self.controller.data_dir):
+                self.controller.mark_data_changed()
                 self.refresh_data()
                 self.show_message("Success", "Expense deleted successfully", "info")
-            except Exception as e:
-                self.show_message("Error", f"Error deleting expense: {str(e)}", "error")
+            else:
+                self.show_message("Error", "Failed to delete the expense", "error")
     
     def refresh_data(self):
         """Refresh the expense data and view."""
         if self.controller.current_user:
             user_id = self.controller.current_user.user_id
             self.expenses = Expense.get_user_expenses(user_id, self.controller.data_dir)
-            categories = Category.get_all_categories(user_id, self.controller.data_dir)
-            self.categories_dict = {cat.category_id: cat for cat in categories}
-            
-            # Ensure "Income" category has is_income=True
-            for cat_id, cat in self.categories_dict.items():
-                if cat.name == "Income" or cat.name in ["Salary", "Bonus", "Interest", "Dividends", "Freelance", "Rental"]:
-                    cat.is_income = True
-                    cat.save(self.controller.data_dir)
+            self.categories_dict = self.controller.categories_by_id
             
             # Populate category filters
             self._populate_category_filters()
@@ -964,8 +1001,9 @@ class ExpensesFrame(BaseFrame):
         else:
             self.user_var.set("Welcome, User")
         
-        # Refresh expenses data
-        self.refresh_data()
+        # Refresh expenses data if it changed since the last time the frame was shown
+        if self.needs_refresh():
+            self.refresh_data()
 
     def _export_to_csv(self):
         """Export expenses to a CSV file."""
@@ -118,10 +118,11 @@ class LoginFrame(BaseFrame):
         self.error_var.set("")
         self.controller.current_user = user
         
-        # Check if user has categories, if not create default categories
-        user_categories = Category.get_all_categories(user.user_id, self.controller.data_dir)
-        if not user_categories:
+        # Load the user's categories once, creating the defaults if there are none
+        self.controller.refresh_categories()
+        if not self.controller.categories:
             Category.create_default_categories(user.user_id, self.controller.data_dir)
+            self.controller.mark_data_changed()
         
         # Show dashboard
         self.controller.show_frame("DashboardFrame")
@@ -449,6 +450,7 @@ class ProfileFrame(BaseFrame):
         user.preferences["date_format"] = date_format
         
         # Save changes
+        # Preferences and email aren't shown by the data frames, so they don't need refreshing
         if user.save(self.controller.data_dir):
             # Apply theme if changed
             if theme != self.controller.current_theme:
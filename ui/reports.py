@@ -9,7 +9,6 @@ import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from .base import BaseFrame, ScrollableFrame
 from models.expense import Expense
-from models.category import Category
 from utils.analysis import get_monthly_summary, compare_time_periods
 from utils.visualization import (
     create_expense_pie_chart, create_monthly_trend_chart,
@@ -296,8 +295,7 @@ class ReportsFrame(BaseFrame):
         if self.controller.current_user:
             user_id = self.controller.current_user.user_id
             self.expenses = Expense.get_user_expenses(user_id, self.controller.data_dir)
-            categories = Category.get_all_categories(user_id, self.controller.data_dir)
-            self.categories_dict = {cat.category_id: cat for cat in categories}
+            self.categories_dict = self.controller.categories_by_id
             
             # Reload current report
             self._show_monthly_summary()
@@ -329,5 +327,6 @@ class ReportsFrame(BaseFrame):
         else:
             self.user_var.set("Welcome, User")
         
-        # Refresh report data
-        self.refresh_data()
+        # Refresh report data if it changed since the last time the frame was shown
+        if self.needs_refresh():
+            self.refresh_data()
@@ -781,25 +781,20 @@ def export_expenses_to_csv(file_path, expenses, categories_dict=None):
                 "payment_method", "tags"
             ])
             
-            # Write data
-            for expense in expenses:
-                # Get category name if available
-                category_name = ""
-                if categories_dict and expense.category_id in categories_dict:
-                    category_name = categories_dict[expense.category_id].name
-                
-                # Format tags as comma-separated
-                tags = ",".join(expense.tags) if expense.tags else ""
-                
-                csv_writer.writerow([
-                    expense.date,
-                    expense.description,
-                    category_name,
-                    f"{expense.amount:.2f}",
-                    "Yes" if expense.is_income else "No",
-                    expense.payment_method or "",
-                    tags
-                ])
+            # Get category names if available
+            category_names = {cid: cat.name for cid, cat in categories_dict.items()} if categories_dict else {}
+            
+            # Write data, with tags as comma-separated
+            csv_writer.writerows(
+                (expense.date,
+                 expense.description,
+                 category_names.get(expense.category_id, ""),
+                 f"{expense.amount:.2f}",
+                 "Yes" if expense.is_income else "No",
+                 expense.payment_method or "",
+                 ",".join(expense.tags) if expense.tags else "")
+                for expense in expenses
+            )
         
         return True, len(expenses), os.path.basename(file_path)
             